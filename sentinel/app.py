@@ -1,11 +1,16 @@
 from __future__ import annotations
 
-import json
+import dataclasses
+import functools
 import sys
+from bisect import bisect_left
+from collections import ChainMap
 from datetime import datetime, timezone, timedelta
 from pathlib import Path
-from typing import Any, Dict, Optional, List
+from typing import Any, Callable, Dict, Optional, List, Tuple
 
+import fastjsonschema
+import orjson
 from jsonschema import Draft202012Validator
 
 from sentinel.engine.ingest import Ingestor, IngestResult
@@ -19,10 +24,18 @@ from sentinel.engine.routing import RoutingPolicy
 from sentinel.engine.correlation import CorrelationStore
 
 
+# Human-readable console output (same key order as the persisted JSONL)
+_PRETTY_JSON_OPTS = orjson.OPT_INDENT_2 | orjson.OPT_SORT_KEYS
+
+
+def _read_json(path: Path) -> Any:
+    # orjson parses the raw bytes directly (no separate UTF-8 decode pass)
+    return orjson.loads(path.read_bytes())
+
+
 def load_json(path: Path) -> Dict[str, Any]:
     try:
-        raw = path.read_text(encoding="utf-8")
-        obj = json.loads(raw)
+        obj = _read_json(path)
     except Exception as e:
         raise RuntimeError(f"Failed to load JSON from {path}: {e}") from e
     if not isinstance(obj, dict):
@@ -36,17 +49,44 @@ def load_json_obj(path: Path) -> Dict[str, Any]:
     """
     if not path.exists():
         raise FileNotFoundError(f"Config not found: {path}")
-    obj = json.loads(path.read_text(encoding="utf-8"))
+    obj = _read_json(path)
     if not isinstance(obj, dict):
         raise ValueError(f"Config must be a JSON object: {path}")
     return obj
 
 
-def load_schema_validator(schema_path: Path) -> Draft202012Validator:
+AlertValidator = Callable[[Dict[str, Any]], Any]
+
+
+@functools.lru_cache(maxsize=8)
+def _compile_schema_validator(schema_path: Path, mtime_ns: int) -> AlertValidator:
+    # mtime_ns is part of the cache key only; an edited schema gets a fresh validator.
+    schema = _read_json(schema_path)
+    Draft202012Validator.check_schema(schema)
+    # fastjsonschema walks the schema once here and emits one specialised function per
+    # subschema node, so per-alert validation never re-resolves schema paths.
+    # Formats are annotations only (matches jsonschema's default behavior).
+    return fastjsonschema.compile(schema, use_formats=False)
+
+
+def load_schema_validator(schema_path: Path) -> AlertValidator:
     if not schema_path.exists():
         raise FileNotFoundError(f"Schema not found: {schema_path}")
-    schema = json.loads(schema_path.read_text(encoding="utf-8"))
-    return Draft202012Validator(schema)
+    return _compile_schema_validator(schema_path, schema_path.stat().st_mtime_ns)
+
+
+def _validate_alert_fast(validator: AlertValidator, alert: Dict[str, Any]) -> Optional[Tuple[str, str]]:
+    """
+    Validate an alert with the compiled schema validator.
+    Returns (error_location, error_message) for the first error, or None if valid.
+    """
+    try:
+        validator(alert)
+    except fastjsonschema.JsonSchemaException as e:
+        # Compiled paths are rooted at "data"; keep the "(root)" convention used elsewhere.
+        loc = ".".join(str(p) for p in (e.path or [])[1:]) or "(root)"
+        return loc, e.message
+    return None
 
 
 def _resolve_base_dir() -> Path:
@@ -62,26 +102,62 @@ def _resolve_base_dir() -> Path:
     return Path(__file__).resolve().parent
 
 
-def _safe_str(v: Any) -> Optional[str]:
-    if v is None:
-        return None
+@functools.lru_cache(maxsize=4096, typed=True)
+def _safe_str_cached(v: Any) -> Optional[str]:
     s = str(v).strip()
     return s if s else None
 
 
-def _parse_iso(ts: str) -> datetime:
-    # accepts "Z" suffix; datetime.fromisoformat needs "+00:00"
-    if ts.endswith("Z"):
-        ts = ts[:-1] + "+00:00"
-    return datetime.fromisoformat(ts)
+def _safe_str(v: Any) -> Optional[str]:
+    # Hot path: most values are already str (no str() call needed)
+    if v is None:
+        return None
+    if isinstance(v, str):
+        s = v.strip()
+        return s if s else None
+    try:
+        return _safe_str_cached(v)
+    except TypeError:
+        # unhashable (list/dict); not worth caching
+        s = str(v).strip()
+        return s if s else None
+
+
+# Placeholders for metadata the correlation store does not keep (sweep synthetic events)
+_SYNTHETIC_EVENT_DEFAULTS: Dict[str, Any] = {
+    "source_system": "DBR",
+    "site": "UNKNOWN_SITE",
+    "area": "UNKNOWN_AREA",
+    "product_id": "UNKNOWN_PRODUCT",
+    "dbr_template_id": "UNKNOWN_TEMPLATE",
+    "dbr_template_version": "0.1",
+    "page_number": 1,
+    "step_code": "UNKNOWN_STEP",
+    "section_code": "UNKNOWN_SECTION",
+    "operator_role": "OPERATOR",
+    "operator_token": "UNKNOWN_OPERATOR",
+}
+
+
+if sys.version_info >= (3, 11):
+    # fromisoformat accepts the "Z" suffix natively; no Python-level wrapper needed
+    _parse_iso = datetime.fromisoformat
+else:
+
+    def _parse_iso(ts: str) -> datetime:
+        # accepts "Z" suffix; datetime.fromisoformat needs "+00:00"
+        if ts.endswith("Z"):
+            ts = ts[:-1] + "+00:00"
+        return datetime.fromisoformat(ts)
 
 
 def _now_utc_iso() -> str:
     return datetime.now(timezone.utc).isoformat()
 
 
-def _suppression_key(event: Dict[str, Any], rule_id: Optional[str]) -> str:
-    parts = [
+def _suppression_key(event: Dict[str, Any], rule_id: Optional[str]) -> Tuple[str, ...]:
+    # Tuple key: cheap to build/hash; the stores join it with "|" only when persisting.
+    return (
         _safe_str(rule_id) or "",
         _safe_str(event.get("site")) or "",
         _safe_str(event.get("area")) or "",
@@ -91,20 +167,17 @@ def _suppression_key(event: Dict[str, Any], rule_id: Optional[str]) -> str:
         _safe_str(event.get("step_code")) or "",
         _safe_str(event.get("section_code")) or "",
         _safe_str(event.get("batch_token")) or "",
-    ]
-    return "|".join(parts)
-
-
-def _make_group_key(event: Dict[str, Any]) -> str:
-    return "|".join(
-        [
-            _safe_str(event.get("site")) or "",
-            _safe_str(event.get("area")) or "",
-            _safe_str(event.get("product_id")) or "",
-            _safe_str(event.get("dbr_template_id")) or "",
-            _safe_str(event.get("step_code")) or "",
-            _safe_str(event.get("section_code")) or "",
-        ]
+    )
+
+
+def _make_group_key(event: Dict[str, Any]) -> Tuple[str, ...]:
+    return (
+        _safe_str(event.get("site")) or "",
+        _safe_str(event.get("area")) or "",
+        _safe_str(event.get("product_id")) or "",
+        _safe_str(event.get("dbr_template_id")) or "",
+        _safe_str(event.get("step_code")) or "",
+        _safe_str(event.get("section_code")) or "",
     )
 
 
@@ -126,7 +199,7 @@ def _sweep_timeouts(
     correlation_store: CorrelationStore,
     alert_builder: AlertBuilder,
     alert_store: AlertStore,
-    alert_validator: Draft202012Validator,
+    alert_validator: AlertValidator,
 ) -> int:
     """
     Sweep correlation state and emit timeout alerts for STEP_OPENED events that have
@@ -149,6 +222,7 @@ def _sweep_timeouts(
         return 2
 
     if not bool(cfg.get("enabled", True)):
+        audit.flush()
         print("SWEEP disabled by config.")
         return 0
 
@@ -170,166 +244,156 @@ def _sweep_timeouts(
     suppression_cfg = cfg.get("suppression", {}) or {}
     window_minutes = int(suppression_cfg.get("window_minutes", threshold_min))
 
-    # Load raw correlation state from disk
+    # Enforce routing allow-list once; consumers are the same for every sweep alert. A
+    # rejection only fails the sweep once an alert actually needs routing (see below).
+    routing_error: Optional[Exception] = None
+    consumers_norm: List[str] = []
     try:
-        state = json.loads((correlation_store.path).read_text(encoding="utf-8"))
+        consumers_norm = routing_policy.normalize(consumers).consumers
     except Exception as e:
-        audit.log_internal_error(
-            component="SWEEP",
-            error_code="CORRELATION_STATE_READ_FAILED",
-            error_text=str(e),
-        )
-        print("Correlation state unreadable.", file=sys.stderr)
-        return 2
-
-    groups = state.get("groups", {}) if isinstance(state, dict) else {}
-    if not isinstance(groups, dict):
-        print("Correlation state malformed.", file=sys.stderr)
-        return 2
+        routing_error = e
+
+    # Every sweep alert comes from the same rule; bind the builder to it once.
+    match = RuleMatchResult(
+        matched=True,
+        rule_id=rule_id,
+        rule_version=rule_version,
+        risk_code=risk_code,
+        severity=severity,
+        recommended_action=recommended_action,
+        routing_consumers=consumers_norm,
+        suppression_window_minutes=int(window_minutes),
+        correlation={"type": "STEP_TIMEOUT_SWEEP", "threshold_minutes": threshold_min},
+        qa_escalation=None,
+    )
+    build_sweep_alert = alert_builder.specialize(match)
 
-    emitted = 0
+    alerts: List[Dict[str, Any]] = []
     now = datetime.now(timezone.utc)
-
-    for _, events in groups.items():
-        if not isinstance(events, list):
-            continue
-
-        # index completions by batch_token
-        completions: Dict[str, List[datetime]] = {}
-        for e in events:
-            if not isinstance(e, dict):
-                continue
-            if _safe_str(e.get("event_type")) != pair_type:
-                continue
-            bt = _safe_str(e.get("batch_token"))
-            if not bt:
+    # One clock reading per sweep tick: used for received_at, missing-timestamp
+    # fallbacks and alert created_at.
+    now_iso = now.isoformat()
+    threshold_td = timedelta(minutes=threshold_min)
+
+    # audit.batch() waits on exit until the sweep's audit records have been written.
+    with audit.batch():
+        # The store hands out one group at a time and drops it from its own document, so
+        # only the current group's index is live and finished records are freed as the
+        # sweep advances (the sweep never writes correlation state).
+        for _group_key, events in correlation_store.release_groups():
+            if not isinstance(events, list):
                 continue
-            try:
-                ts = _parse_iso(_safe_str(e.get("event_timestamp")) or _now_utc_iso())
-            except Exception:
-                continue
-            completions.setdefault(bt, []).append(ts)
 
-        # process openings
-        for e in events:
-            if not isinstance(e, dict):
-                continue
-            if _safe_str(e.get("event_type")) != "STEP_OPENED":
-                continue
-            bt = _safe_str(e.get("batch_token"))
-            if not bt:
-                continue
-
-            try:
-                opened_at = _parse_iso(_safe_str(e.get("event_timestamp")) or _now_utc_iso())
-            except Exception:
-                continue
-
-            # Only consider truly overdue openings
-            if opened_at + timedelta(minutes=threshold_min) > now:
-                continue
-
-            # Completion within [opened_at, opened_at + threshold] ?
-            ok = False
-            for cts in completions.get(bt, []):
-                if opened_at <= cts <= opened_at + timedelta(minutes=threshold_min):
-                    ok = True
-                    break
-            if ok:
-                continue
-
-            # Metadata-only synthetic event for alert building
-            synthetic_event = dict(e)
-            synthetic_event["event_id"] = _safe_str(e.get("event_id")) or f"SWEEP-{bt}-{int(opened_at.timestamp())}"
-            synthetic_event["event_timestamp"] = (opened_at + timedelta(minutes=threshold_min)).isoformat()
-            # NOTE: received_at is system-generated; not part of ingest schema
-            synthetic_event.setdefault("source_system", "DBR")
-            synthetic_event.setdefault("site", "UNKNOWN_SITE")
-            synthetic_event.setdefault("area", "UNKNOWN_AREA")
-            synthetic_event.setdefault("product_id", "UNKNOWN_PRODUCT")
-            synthetic_event.setdefault("dbr_template_id", "UNKNOWN_TEMPLATE")
-            synthetic_event.setdefault("dbr_template_version", "0.1")
-            synthetic_event.setdefault("page_number", 1)
-            synthetic_event.setdefault("step_code", "UNKNOWN_STEP")
-            synthetic_event.setdefault("section_code", "UNKNOWN_SECTION")
-            synthetic_event.setdefault("operator_role", "OPERATOR")
-            synthetic_event.setdefault("operator_token", "UNKNOWN_OPERATOR")
-            synthetic_event["received_at"] = _now_utc_iso()
-
-            # Enforce routing allow-list
-            try:
-                routing = routing_policy.normalize(consumers)
-                consumers_norm = routing.consumers
-                audit.log_routing_applied(
-                    _safe_str(synthetic_event.get("event_id")),
-                    rule_id,
-                    consumers_norm,
-                    routing_policy.version,
-                )
-            except Exception as ex:
-                audit.log_internal_error(
-                    component="ROUTING_POLICY",
-                    error_code="ROUTING_NOT_ALLOWED",
-                    error_text=str(ex),
-                    event_id=_safe_str(synthetic_event.get("event_id")),
+            # Single pass: index completions and openings by batch_token,
+            # parsing each event_timestamp exactly once.
+            completions: Dict[str, List[datetime]] = {}
+            openings: List[Tuple[str, datetime, Dict[str, Any]]] = []
+            for e in events:
+                if not isinstance(e, dict):
+                    continue
+                event_type = _safe_str(e.get("event_type"))
+                if event_type != pair_type and event_type != "STEP_OPENED":
+                    continue
+                bt = _safe_str(e.get("batch_token"))
+                if not bt:
+                    continue
+                try:
+                    ts = _parse_iso(_safe_str(e.get("event_timestamp")) or now_iso)
+                except Exception:
+                    continue
+                if event_type == pair_type:
+                    completions.setdefault(bt, []).append(ts)
+                if event_type == "STEP_OPENED":
+                    openings.append((bt, ts, e))
+
+            # Sorted per batch_token so the completion-window check is a binary search
+            for completed_at in completions.values():
+                completed_at.sort()
+
+            # process openings
+            for bt, opened_at, e in openings:
+                deadline = opened_at + threshold_td
+
+                # Only consider truly overdue openings
+                if deadline > now:
+                    continue
+
+                # Completion within [opened_at, opened_at + threshold] ?
+                # First completion at/after opened_at decides it.
+                completed_at = completions.get(bt)
+                if completed_at:
+                    i = bisect_left(completed_at, opened_at)
+                    if i < len(completed_at) and completed_at[i] <= deadline:
+                        continue
+
+                event_id = _safe_str(e.get("event_id")) or f"SWEEP-{bt}-{int(opened_at.timestamp())}"
+
+                if routing_error is not None:
+                    audit.log_internal_error(
+                        component="ROUTING_POLICY",
+                        error_code="ROUTING_NOT_ALLOWED",
+                        error_text=str(routing_error),
+                        event_id=event_id,
+                        rule_id=rule_id,
+                    )
+                    print(f"SWEEP routing rejected: {routing_error}", file=sys.stderr)
+                    return 2
+
+                # Suppression check first (sweep should not spam): most overdue openings
+                # are suppressed, so nothing else is built for them. The key reads the
+                # stored record with synthetic defaults layered underneath.
+                key = _suppression_key(ChainMap(e, _SYNTHETIC_EVENT_DEFAULTS), rule_id)
+                decision = suppression_store.check_and_update(suppression_key=key, window_minutes=int(window_minutes))
+                if decision.suppressed:
+                    audit.log_alert_suppressed(
+                        event_id=event_id,
+                        rule_id=rule_id,
+                        suppression_key=decision.suppression_key,
+                        window_minutes=decision.window_minutes,
+                        last_emitted_at=decision.last_emitted_at,
+                    )
+                    continue
+
+                # Metadata-only synthetic event for alert building (stored fields win over defaults)
+                synthetic_event = {**_SYNTHETIC_EVENT_DEFAULTS, **e}
+                synthetic_event["event_id"] = event_id
+                synthetic_event["event_timestamp"] = deadline.isoformat()
+                # NOTE: received_at is system-generated; not part of ingest schema
+                synthetic_event["received_at"] = now_iso
+
+                audit.log_routing_applied(event_id, rule_id, consumers_norm, routing_policy.version)
+
+                audit.log_correlation_hit(
+                    event_id=event_id,
                     rule_id=rule_id,
+                    matched_event_ids=[event_id],
+                    window_minutes=threshold_min,
                 )
-                continue
 
-            # Suppression check (sweep should not spam)
-            key = _suppression_key(synthetic_event, rule_id)
-            decision = suppression_store.check_and_update(suppression_key=key, window_minutes=int(window_minutes))
-            if decision.suppressed:
-                audit.log_alert_suppressed(
-                    event_id=_safe_str(synthetic_event.get("event_id")),
-                    rule_id=rule_id,
-                    suppression_key=decision.suppression_key,
-                    window_minutes=decision.window_minutes,
-                    last_emitted_at=decision.last_emitted_at,
-                )
-                continue
-
-            # Use RuleMatchResult to feed AlertBuilder
-            match = RuleMatchResult(
-                matched=True,
-                rule_id=rule_id,
-                rule_version=rule_version,
-                risk_code=risk_code,
-                severity=severity,
-                recommended_action=recommended_action,
-                routing_consumers=consumers_norm,
-                suppression_window_minutes=int(window_minutes),
-                correlation={"type": "STEP_TIMEOUT_SWEEP", "threshold_minutes": threshold_min},
-                qa_escalation=None,
-            )
-
-            audit.log_correlation_hit(
-                event_id=_safe_str(synthetic_event.get("event_id")),
-                rule_id=rule_id,
-                matched_event_ids=[_safe_str(synthetic_event.get("event_id")) or "UNKNOWN"],
-                window_minutes=threshold_min,
-            )
-
-            alert_obj = alert_builder.build_alert(synthetic_event, match)
-
-            errors = sorted(alert_validator.iter_errors(alert_obj), key=lambda er: er.path)
-            if errors:
-                loc = ".".join(str(p) for p in errors[0].path) or "(root)"
-                msg = f"Alert schema validation failed at {loc}: {errors[0].message}"
-                audit.log_internal_error(
-                    component="ALERT_SCHEMA_VALIDATE",
-                    error_code="ALERT_SCHEMA_INVALID",
-                    error_text=msg,
-                    event_id=_safe_str(synthetic_event.get("event_id")),
-                    rule_id=rule_id,
-                    alert_id=_safe_str(alert_obj.get("alert_id")),
-                )
-                continue
-
-            alert_store.append(alert_obj)
-            emitted += 1
-
-    print(f"SWEEP COMPLETE ✅  emitted={emitted}")
+                alert_obj = build_sweep_alert(synthetic_event, now_iso)
+
+                error = _validate_alert_fast(alert_validator, alert_obj)
+                if error is not None:
+                    loc, detail = error
+                    msg = f"Alert schema validation failed at {loc}: {detail}"
+                    audit.log_internal_error(
+                        component="ALERT_SCHEMA_VALIDATE",
+                        error_code="ALERT_SCHEMA_INVALID",
+                        error_text=msg,
+                        event_id=event_id,
+                        rule_id=rule_id,
+                        alert_id=_safe_str(alert_obj.get("alert_id")),
+                    )
+                    continue
+
+                alerts.append(alert_obj)
+
+        # Suppression updates are durable before any alert that depends on them is written;
+        # the alerts then go out in one batch (one handle, one fsync).
+        suppression_store.flush(force=True)
+        alert_store.append_many(alerts)
+
+    print(f"SWEEP COMPLETE ✅  emitted={len(alerts)}")
     return 0
 
 
@@ -356,134 +420,146 @@ def main(argv: list[str]) -> int:
 
     audit = AuditLogger(audit_log_path)
 
-    alert_validator = load_schema_validator(schemas_dir / "alert_schema_v0_1.json")
-    rules_engine = RulesEngine(rules_path=rules_dir / "rules_v0_1.yaml", audit_logger=audit)
-
-    alert_builder = AlertBuilder(audit_logger=audit)
-    alert_store = AlertStore(alerts_path=alerts_path, audit_logger=audit)
-
-    suppression_store = SuppressionStore(storage_dir / "suppression_state_v0_1.json")
-    routing_policy = RoutingPolicy(config_dir / "consumers_allowlist_v0_1.json")
-    correlation_store = CorrelationStore(storage_dir / "correlation_state_v0_1.json")
-
-    # Sweep mode (config-driven; does not depend on RulesEngine internals)
-    if len(argv) == 2 and argv[1] == "--sweep-timeouts":
-        sweep_cfg_path = config_dir / "sweep_timeouts_v0_1.json"
-        return _sweep_timeouts(
-            audit=audit,
-            sweep_cfg_path=sweep_cfg_path,
-            routing_policy=routing_policy,
-            suppression_store=suppression_store,
-            correlation_store=correlation_store,
-            alert_builder=alert_builder,
-            alert_store=alert_store,
-            alert_validator=alert_validator,
-        )
-
-    # Normal mode
-    if len(argv) != 2:
-        print(
-            "Usage: python -m sentinel.app <path_to_event.json>  OR  python -m sentinel.app --sweep-timeouts",
-            file=sys.stderr,
-        )
-        return 2
-
-    event_path = Path(argv[1]).resolve()
-    if not event_path.exists() or not event_path.is_file():
-        print(f"Event file not found: {event_path}", file=sys.stderr)
-        return 2
-
-    ingestor = Ingestor(
-        event_schema_path=schemas_dir / "event_schema_v0_1.json",
-        tripwire_config_path=schemas_dir / "prohibited_fields_v0_1.json",
-        audit_logger=audit,
-    )
-
-    event = load_json(event_path)
-
-    ingest_result: IngestResult = ingestor.process_event(event)
-    if not ingest_result.accepted or not ingest_result.accepted_event:
-        print("REJECTED ❌")
-        print(json.dumps(ingest_result.rejection.to_dict(), indent=2, sort_keys=True))
-        return 1
+    # Every exit path drains the audit writer; a failed audit write surfaces here (and in
+    # the flush() before each result banner) as an error, never as a silent success.
+    try:
+        alert_validator = load_schema_validator(schemas_dir / "alert_schema_v0_1.json")
+        rules_engine = RulesEngine(rules_path=rules_dir / "rules_v0_1.yaml", audit_logger=audit)
+
+        alert_builder = AlertBuilder(audit_logger=audit)
+        alert_store = AlertStore(alerts_path=alerts_path, audit_logger=audit)
+
+        suppression_store = SuppressionStore(storage_dir / "suppression_state_v0_1.json")
+        routing_policy = RoutingPolicy(config_dir / "consumers_allowlist_v0_1.json")
+        correlation_store = CorrelationStore(storage_dir / "correlation_state_v0_1.json")
+
+        # Sweep mode (config-driven; does not depend on RulesEngine internals)
+        if len(argv) == 2 and argv[1] == "--sweep-timeouts":
+            sweep_cfg_path = config_dir / "sweep_timeouts_v0_1.json"
+            return _sweep_timeouts(
+                audit=audit,
+                sweep_cfg_path=sweep_cfg_path,
+                routing_policy=routing_policy,
+                suppression_store=suppression_store,
+                correlation_store=correlation_store,
+                alert_builder=alert_builder,
+                alert_store=alert_store,
+                alert_validator=alert_validator,
+            )
 
-    accepted_event = ingest_result.accepted_event
-    print("ACCEPTED ✅")
+        # Normal mode
+        if len(argv) != 2:
+            print(
+                "Usage: python -m sentinel.app <path_to_event.json>  OR  python -m sentinel.app --sweep-timeouts",
+                file=sys.stderr,
+            )
+            return 2
 
-    event_id = _safe_str(accepted_event.get("event_id"))
+        event_path = Path(argv[1]).resolve()
+        if not event_path.exists() or not event_path.is_file():
+            print(f"Event file not found: {event_path}", file=sys.stderr)
+            return 2
 
-    # Correlation state: store minimal event record (including batch_token) and prune
-    try:
-        _store_correlation_event(correlation_store, accepted_event)
-        correlation_store.prune(max_age_minutes=24 * 60)
-        audit.log_correlation_pruned(max_age_minutes=24 * 60)
-    except Exception as e:
-        audit.log_internal_error(
-            component="CORRELATION_STORE",
-            error_code="CORRELATION_STORE_ERROR",
-            error_text=str(e),
-            event_id=event_id,
+        ingestor = Ingestor(
+            event_schema_path=schemas_dir / "event_schema_v0_1.json",
+            tripwire_config_path=schemas_dir / "prohibited_fields_v0_1.json",
+            audit_logger=audit,
         )
 
-    match_result: RuleMatchResult = rules_engine.evaluate(accepted_event)
+        event = load_json(event_path)
+
+        ingest_result: IngestResult = ingestor.process_event(event)
+        if not ingest_result.accepted or not ingest_result.accepted_event:
+            audit.flush()
+            print("REJECTED ❌")
+            print(orjson.dumps(ingest_result.rejection.to_dict(), option=_PRETTY_JSON_OPTS).decode())
+            return 1
+
+        accepted_event = ingest_result.accepted_event
+        audit.flush()
+        print("ACCEPTED ✅")
+
+        event_id = _safe_str(accepted_event.get("event_id"))
+
+        # Correlation state: store minimal event record (including batch_token) and prune
+        try:
+            _store_correlation_event(correlation_store, accepted_event)
+            correlation_store.prune(max_age_minutes=24 * 60)
+            correlation_store.checkpoint()
+            audit.log_correlation_pruned(max_age_minutes=24 * 60)
+        except Exception as e:
+            audit.log_internal_error(
+                component="CORRELATION_STORE",
+                error_code="CORRELATION_STORE_ERROR",
+                error_text=str(e),
+                event_id=event_id,
+            )
 
-    if not match_result.matched:
-        print("NO ALERT 💤")
-        return 0
+        match_result: RuleMatchResult = rules_engine.evaluate(accepted_event)
 
-    # Routing enforcement
-    try:
-        routing = routing_policy.normalize(match_result.routing_consumers)
-        match_result.routing_consumers = routing.consumers
-        audit.log_routing_applied(event_id, match_result.rule_id, routing.consumers, routing_policy.version)
-    except Exception as e:
-        audit.log_internal_error(
-            component="ROUTING_POLICY",
-            error_code="ROUTING_NOT_ALLOWED",
-            error_text=str(e),
-            event_id=event_id,
-            rule_id=match_result.rule_id,
-        )
-        raise
-
-    # Suppression
-    window = match_result.suppression_window_minutes
-    if window and int(window) > 0:
-        key = _suppression_key(accepted_event, match_result.rule_id)
-        decision = suppression_store.check_and_update(suppression_key=key, window_minutes=int(window))
-        if decision.suppressed:
-            audit.log_alert_suppressed(
+        if not match_result.matched:
+            audit.flush()
+            print("NO ALERT 💤")
+            return 0
+
+        # Routing enforcement
+        try:
+            routing = routing_policy.normalize(match_result.routing_consumers)
+            match_result = dataclasses.replace(match_result, routing_consumers=routing.consumers)
+            audit.log_routing_applied(event_id, match_result.rule_id, routing.consumers, routing_policy.version)
+        except Exception as e:
+            audit.log_internal_error(
+                component="ROUTING_POLICY",
+                error_code="ROUTING_NOT_ALLOWED",
+                error_text=str(e),
                 event_id=event_id,
                 rule_id=match_result.rule_id,
-                suppression_key=decision.suppression_key,
-                window_minutes=decision.window_minutes,
-                last_emitted_at=decision.last_emitted_at,
             )
-            print("ALERT SUPPRESSED 🧱")
-            return 0
-
-    # Build and validate alert
-    alert_obj = alert_builder.build_alert(accepted_event, match_result)
-
-    errors = sorted(alert_validator.iter_errors(alert_obj), key=lambda e: e.path)
-    if errors:
-        loc = ".".join(str(p) for p in errors[0].path) or "(root)"
-        msg = f"Alert schema validation failed at {loc}: {errors[0].message}"
-        audit.log_internal_error(
-            component="ALERT_SCHEMA_VALIDATE",
-            error_code="ALERT_SCHEMA_INVALID",
-            error_text=msg,
-            event_id=event_id,
-            rule_id=match_result.rule_id,
-            alert_id=_safe_str(alert_obj.get("alert_id")),
-        )
-        raise RuntimeError(msg)
+            raise
+
+        # Suppression
+        window = match_result.suppression_window_minutes
+        if window and int(window) > 0:
+            key = _suppression_key(accepted_event, match_result.rule_id)
+            decision = suppression_store.check_and_update(suppression_key=key, window_minutes=int(window))
+            suppression_store.flush(force=True)
+            if decision.suppressed:
+                audit.log_alert_suppressed(
+                    event_id=event_id,
+                    rule_id=match_result.rule_id,
+                    suppression_key=decision.suppression_key,
+                    window_minutes=decision.window_minutes,
+                    last_emitted_at=decision.last_emitted_at,
+                )
+                audit.flush()
+                print("ALERT SUPPRESSED 🧱")
+                return 0
+
+        # Build and validate alert
+        alert_obj = alert_builder.build_alert(accepted_event, match_result)
+
+        error = _validate_alert_fast(alert_validator, alert_obj)
+        if error is not None:
+            loc, detail = error
+            msg = f"Alert schema validation failed at {loc}: {detail}"
+            audit.log_internal_error(
+                component="ALERT_SCHEMA_VALIDATE",
+                error_code="ALERT_SCHEMA_INVALID",
+                error_text=msg,
+                event_id=event_id,
+                rule_id=match_result.rule_id,
+                alert_id=_safe_str(alert_obj.get("alert_id")),
+            )
+            raise RuntimeError(msg)
 
-    alert_store.append(alert_obj)
+        alert_store.append(alert_obj)
+        audit.flush()
 
-    print("ALERT EMITTED 🚨")
-    print(json.dumps(alert_obj, indent=2, sort_keys=True))
-    return 0
+        print("ALERT EMITTED 🚨")
+        print(orjson.dumps(alert_obj, option=_PRETTY_JSON_OPTS).decode())
+        return 0
+    finally:
+        audit.close()
 
 
 if __name__ == "__main__":
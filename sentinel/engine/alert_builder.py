@@ -1,11 +1,29 @@
 from __future__ import annotations
 
-import uuid
+import os
+import random
 from datetime import datetime, timezone
-from typing import Any, Dict, Optional
+from typing import Any, Callable, Dict, Optional
 
 from sentinel.engine.rules_engine import RuleMatchResult
 
+# Alert IDs need collision resistance, not secrecy: one OS-seeded PRNG per process
+# instead of a getrandom() syscall per alert. Reseeded in forked children so
+# parent and child never share a sequence.
+_ALERT_ID_RNG = random.Random(os.urandom(32))
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=lambda: _ALERT_ID_RNG.seed(os.urandom(32)))
+
+# Optional metadata fields (still safe); copied only when present and not None.
+_OPTIONAL_EVENT_KEYS = (
+    "suite",
+    "line",
+    "page_number",
+    "batch_token",
+    "operator_role",
+    "operator_token",
+)
+
 
 class AlertBuilder:
     """
@@ -22,57 +40,79 @@ class AlertBuilder:
 
     @staticmethod
     def _new_alert_id() -> str:
-        # Stable length, low collision risk
-        return f"ALT-{uuid.uuid4().hex[:24]}"
-
-    def build_alert(self, event: Dict[str, Any], match: RuleMatchResult) -> Dict[str, Any]:
-        event_id = str(event.get("event_id", "")) or None
-
-        alert: Dict[str, Any] = {
-            "alert_id": self._new_alert_id(),
-            "created_at": self._now_utc_iso(),
-            "status": "NEW",
-            "severity": match.severity,
-            "risk_code": match.risk_code,
-            "source_system": event.get("source_system"),
-            "site": event.get("site"),
-            "area": event.get("area"),
-            "product_id": event.get("product_id"),
-            "dbr_template_id": event.get("dbr_template_id"),
-            "dbr_template_version": event.get("dbr_template_version"),
-            "step_code": event.get("step_code"),
-            "section_code": event.get("section_code"),
-            "rule_id": match.rule_id,
-            "rule_version": match.rule_version,
-        }
-
-        # Optional metadata fields (still safe)
-        for optional_key in [
-            "suite",
-            "line",
-            "page_number",
-            "batch_token",
-            "operator_role",
-            "operator_token",
-        ]:
-            if optional_key in event and event.get(optional_key) is not None:
-                alert[optional_key] = event.get(optional_key)
-
-        if event_id:
-            alert["event_refs"] = [event_id]
-
-        if match.recommended_action:
-            # bounded already in schema; keep as-is
-            alert["recommended_action"] = match.recommended_action
-
-        # NOTE: closure_category and closure_notes are optional and not set here.
-        # They are only set when an alert is CLOSED.
-
-        self._audit.log_alert_built(
-            event_id=event_id,
-            alert_id=alert.get("alert_id"),
-            rule_id=match.rule_id,
-            risk_code=match.risk_code,
-            severity=match.severity,
-        )
-        return alert
+        # Stable length (24 hex chars / 96 bits), low collision risk
+        return f"ALT-{_ALERT_ID_RNG.getrandbits(96):024x}"
+
+    def build_alert(
+        self,
+        event: Dict[str, Any],
+        match: RuleMatchResult,
+        created_at: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        return self.specialize(match)(event, created_at)
+
+    def specialize(self, match: RuleMatchResult) -> Callable[..., Dict[str, Any]]:
+        """
+        Return an alert-building function bound to a single rule match.
+        Rule-derived fields are captured once, so callers emitting many alerts for the
+        same match (e.g. the timeout sweep) only pay for the per-event fields.
+
+        The returned function accepts an optional created_at (UTC ISO) so batch callers
+        can stamp alerts with one clock reading instead of querying the clock per alert.
+        """
+        severity = match.severity
+        risk_code = match.risk_code
+        rule_id = match.rule_id
+        rule_version = match.rule_version
+        recommended_action = match.recommended_action
+
+        new_alert_id = self._new_alert_id
+        now_utc_iso = self._now_utc_iso
+        log_alert_built = self._audit.log_alert_built
+
+        def build(event: Dict[str, Any], created_at: Optional[str] = None) -> Dict[str, Any]:
+            event_id = str(event.get("event_id", "")) or None
+
+            alert: Dict[str, Any] = {
+                "alert_id": new_alert_id(),
+                "created_at": created_at or now_utc_iso(),
+                "status": "NEW",
+                "severity": severity,
+                "risk_code": risk_code,
+                "source_system": event.get("source_system"),
+                "site": event.get("site"),
+                "area": event.get("area"),
+                "product_id": event.get("product_id"),
+                "dbr_template_id": event.get("dbr_template_id"),
+                "dbr_template_version": event.get("dbr_template_version"),
+                "step_code": event.get("step_code"),
+                "section_code": event.get("section_code"),
+                "rule_id": rule_id,
+                "rule_version": rule_version,
+            }
+
+            for optional_key in _OPTIONAL_EVENT_KEYS:
+                value = event.get(optional_key)
+                if value is not None:
+                    alert[optional_key] = value
+
+            if event_id:
+                alert["event_refs"] = [event_id]
+
+            if recommended_action:
+                # bounded already in schema; keep as-is
+                alert["recommended_action"] = recommended_action
+
+            # NOTE: closure_category and closure_notes are optional and not set here.
+            # They are only set when an alert is CLOSED.
+
+            log_alert_built(
+                event_id=event_id,
+                alert_id=alert["alert_id"],
+                rule_id=rule_id,
+                risk_code=risk_code,
+                severity=severity,
+            )
+            return alert
+
+        return build
@@ -1,9 +1,14 @@
 from __future__ import annotations
 
-import json
+import os
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Any, Dict
+from typing import Any, Dict, List
+
+import orjson
+
+# Canonical key order, trailing "\n" emitted by orjson itself (one JSONL line per call)
+_JSONL_OPTS = orjson.OPT_SORT_KEYS | orjson.OPT_APPEND_NEWLINE
 
 
 class AlertStore:
@@ -23,8 +28,8 @@ class AlertStore:
         return datetime.now(timezone.utc).isoformat()
 
     def append(self, alert: Dict[str, Any]) -> None:
-        with self.path.open("a", encoding="utf-8") as f:
-            f.write(json.dumps(alert, sort_keys=True) + "\n")
+        with self.path.open("ab") as f:
+            f.write(orjson.dumps(alert, option=_JSONL_OPTS))
 
         self._audit.log_alert_persisted(
             alert_id=str(alert.get("alert_id", "")) or None,
@@ -32,3 +37,25 @@ class AlertStore:
             store_type="JSONL",
             store_path=str(self.path),
         )
+
+    def append_many(self, alerts: List[Dict[str, Any]]) -> None:
+        """
+        Append a batch of alerts through one handle with a single flush + fsync, then write
+        one ALERTS_PERSISTED audit record listing every alert_id. An empty batch is a no-op.
+        """
+        if not alerts:
+            return
+
+        with self.path.open("ab") as f:
+            for alert in alerts:
+                f.write(orjson.dumps(alert, option=_JSONL_OPTS))
+            f.flush()
+            os.fsync(f.fileno())
+
+        self._audit.log_alerts_persisted(
+            count=len(alerts),
+            alert_ids=[str(alert.get("alert_id", "")) for alert in alerts],
+            persisted_at=self._now_utc_iso(),
+            store_type="JSONL",
+            store_path=str(self.path),
+        )
@@ -1,9 +1,51 @@
 from __future__ import annotations
 
-import json
+import atexit
+import os
+import queue
+import threading
+import time
+from contextlib import contextmanager
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Any, Dict, Optional, List
+from typing import Any, BinaryIO, Dict, Iterator, Optional, List, Tuple, Union
+
+import orjson
+
+from sentinel.engine.delta_log import write_all
+
+# Writer-thread tuning
+_QUEUE_MAXSIZE = 10000
+_MAX_DRAIN = 1024  # records coalesced into one write
+_IDLE_FSYNC_SECONDS = 1.0
+
+_STOP = object()  # shutdown sentinel for the writer thread
+
+# logged_at is reused for records within one tick; the tuple is swapped atomically,
+# so concurrent callers at worst format the same tick twice.
+_TS_TICK_SECONDS = 0.001
+_ts_cache: Tuple[float, str] = (0.0, "")
+
+_dumps = orjson.dumps
+
+# Pre-serialized line templates for the per-event record types: the static keys are
+# written once here and only the dynamic values go through orjson (%b slots).
+_INGEST_ACCEPT_LINE = (
+    b'{"record_type":"INGEST_ACCEPT","logged_at":%b,"event_id":%b,"source_system":%b,'
+    b'"event_timestamp":%b,"received_at":%b,"schema_version":%b,"tripwire_version":%b}\n'
+)
+_RULE_EVAL_START_LINE = (
+    b'{"record_type":"RULE_EVAL_START","logged_at":%b,"event_id":%b,"event_type":%b,'
+    b'"ruleset_name":%b,"ruleset_version":%b}\n'
+)
+_RULE_MATCH_LINE = (
+    b'{"record_type":"RULE_MATCH","logged_at":%b,"event_id":%b,"event_type":%b,'
+    b'"rule_id":%b,"rule_version":%b,"risk_code":%b,"severity":%b}\n'
+)
+_RULE_NO_MATCH_LINE = (
+    b'{"record_type":"RULE_NO_MATCH","logged_at":%b,"event_id":%b,"event_type":%b,'
+    b'"ruleset_name":%b,"ruleset_version":%b}\n'
+)
 
 
 class AuditLogger:
@@ -13,7 +55,16 @@ class AuditLogger:
     HARDENING RULES:
       - Never write event payload bodies to disk here.
       - Only minimal metadata for rejects, accepts, rule evaluation, and alert outcomes.
-      - Each audit record is a single JSON object line (JSONL).
+      - Each audit record is a single JSON object line (JSONL), keys in construction
+        order (record_type, logged_at, then the record's fields); no per-record key sort.
+
+    log_* calls only enqueue the record (a dict, or an already serialized line for the
+    per-event record types built from the templates above). A daemon writer thread drains the queue,
+    serializes up to _MAX_DRAIN records per wakeup into one write on a long-lived
+    append handle, and fsyncs when idle. The queue is bounded and callers block when it
+    is full (backpressure) -- audit records are never dropped.
+    flush() waits until everything queued is on disk; close() also fsyncs and stops the
+    writer, and is registered with atexit.
     """
 
     def __init__(self, audit_log_path: Path):
@@ -21,14 +72,163 @@ class AuditLogger:
         self.path.parent.mkdir(parents=True, exist_ok=True)
         self.path.touch(exist_ok=True)
 
+        self._q: "queue.Queue[Any]" = queue.Queue(maxsize=_QUEUE_MAXSIZE)
+        self._writer: Optional[threading.Thread] = None
+        self._error: Optional[BaseException] = None
+        self._batch_depth = 0
+        self._lock = threading.Lock()
+        self._start_writer()
+        atexit.register(self.close)
+
     @staticmethod
     def _now_utc_iso() -> str:
-        return datetime.now(timezone.utc).isoformat()
+        global _ts_cache
+        t = time.time()
+        cached_t, cached_iso = _ts_cache
+        if cached_t <= t < cached_t + _TS_TICK_SECONDS:
+            return cached_iso
+        iso = datetime.fromtimestamp(t, timezone.utc).isoformat()
+        _ts_cache = (t, iso)
+        return iso
+
+    def _start_writer(self) -> None:
+        self._writer = threading.Thread(target=self._writer_loop, name="audit-writer", daemon=True)
+        self._writer.start()
 
-    def _append(self, record: Dict[str, Any]) -> None:
-        # Append-only JSONL; keep it atomic-ish
-        with self.path.open("a", encoding="utf-8") as f:
-            f.write(json.dumps(record, sort_keys=True) + "\n")
+    def _append(self, record: Union[Dict[str, Any], bytes]) -> None:
+        writer = self._writer
+        if writer is None or not writer.is_alive():
+            with self._lock:
+                if self._writer is None:
+                    # Logged after close(): bring the writer back rather than lose the record
+                    self._start_writer()
+                elif not self._writer.is_alive():
+                    # The writer stopped on an error (e.g. the log could not be opened):
+                    # report it here, like a failed synchronous write, before retrying
+                    self._raise_pending_error()
+                    self._start_writer()
+        self._q.put(record)
+
+    def _writer_loop(self) -> None:
+        try:
+            fh = self.path.open("ab", buffering=0)
+        except Exception as e:
+            # Queued records stay queued; flush()/close() see the dead writer and raise
+            self._error = e
+            return
+        dirty = False
+        try:
+            while True:
+                try:
+                    items = [self._q.get(timeout=_IDLE_FSYNC_SECONDS)]
+                except queue.Empty:
+                    if dirty:
+                        self._fsync(fh)
+                        dirty = False
+                    continue
+
+                while len(items) < _MAX_DRAIN:
+                    try:
+                        items.append(self._q.get_nowait())
+                    except queue.Empty:
+                        break
+
+                stop = False
+                buf = bytearray()
+                for rec in items:
+                    if rec is _STOP:
+                        stop = True
+                        continue
+                    if isinstance(rec, bytes):
+                        buf += rec
+                        continue
+                    try:
+                        buf += orjson.dumps(rec, option=orjson.OPT_APPEND_NEWLINE)
+                    except Exception as e:
+                        self._error = e
+
+                try:
+                    if buf:
+                        write_all(fh, buf)
+                        dirty = True
+                    if stop and dirty:
+                        self._fsync(fh)
+                        dirty = False
+                except Exception as e:
+                    self._error = e
+                finally:
+                    for _ in items:
+                        self._q.task_done()
+
+                if stop:
+                    return
+        finally:
+            fh.close()
+
+    def _fsync(self, fh: BinaryIO) -> None:
+        try:
+            os.fsync(fh.fileno())
+        except OSError as e:
+            self._error = e
+
+    def _raise_pending_error(self) -> None:
+        err, self._error = self._error, None
+        if err is not None:
+            raise RuntimeError(f"Audit log write failed: {err}") from err
+
+    def _raise_if_undrained(self) -> None:
+        # Called once the writer has drained the queue or is gone: anything still queued
+        # at that point was never written
+        self._raise_pending_error()
+        unwritten = self._q.unfinished_tasks
+        if unwritten:
+            raise RuntimeError(f"Audit log write failed: writer stopped with {unwritten} record(s) unwritten")
+
+    def flush(self) -> None:
+        """
+        Block until every record queued so far has been written.
+        Raises RuntimeError if a write failed or the writer thread is not running.
+        """
+        writer = self._writer
+        if writer is not None:
+            # Queue.join() would wait forever on a writer that died; wait on the same
+            # condition but give up once the writer is gone
+            done = self._q.all_tasks_done
+            with done:
+                while self._q.unfinished_tasks and writer.is_alive():
+                    done.wait(_IDLE_FSYNC_SECONDS)
+        self._raise_if_undrained()
+
+    def close(self) -> None:
+        """
+        Drain the queue, fsync, and stop the writer thread.
+        Raises RuntimeError if a write failed or queued records could not be written.
+        Safe to call more than once; a later record restarts the writer.
+        """
+        with self._lock:
+            writer, self._writer = self._writer, None
+            if writer is not None and writer.is_alive():
+                self._q.put(_STOP)
+                writer.join()
+        self._raise_if_undrained()
+
+    @contextmanager
+    def batch(self) -> Iterator[None]:
+        """
+        Wait, on exit of a block of work (also on error), until every audit record it
+        queued has been written, via flush(). Nested blocks join the outer batch, so
+        only the outermost exit waits.
+        """
+        with self._lock:
+            self._batch_depth += 1
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._batch_depth -= 1
+                outermost = self._batch_depth == 0
+            if outermost:
+                self.flush()
 
     # -----------------------------
     # Phase 3.1: Ingestion logging
@@ -54,17 +254,18 @@ class AuditLogger:
         schema_version: str,
         tripwire_version: str,
     ) -> None:
-        rec = {
-            "record_type": "INGEST_ACCEPT",
-            "logged_at": self._now_utc_iso(),
-            "event_id": event_id,
-            "source_system": source_system,
-            "event_timestamp": event_timestamp,
-            "received_at": received_at,
-            "schema_version": schema_version,
-            "tripwire_version": tripwire_version,
-        }
-        self._append(rec)
+        self._append(
+            _INGEST_ACCEPT_LINE
+            % (
+                _dumps(self._now_utc_iso()),
+                _dumps(event_id),
+                _dumps(source_system),
+                _dumps(event_timestamp),
+                _dumps(received_at),
+                _dumps(schema_version),
+                _dumps(tripwire_version),
+            )
+        )
 
     # -----------------------------
     # Phase 3.2: Rules + alerts
@@ -89,14 +290,14 @@ class AuditLogger:
         ruleset_version: str,
     ) -> None:
         self._append(
-            {
-                "record_type": "RULE_EVAL_START",
-                "logged_at": self._now_utc_iso(),
-                "event_id": event_id,
-                "event_type": event_type,
-                "ruleset_name": ruleset_name,
-                "ruleset_version": ruleset_version,
-            }
+            _RULE_EVAL_START_LINE
+            % (
+                _dumps(self._now_utc_iso()),
+                _dumps(event_id),
+                _dumps(event_type),
+                _dumps(ruleset_name),
+                _dumps(ruleset_version),
+            )
         )
 
     def log_rule_skipped(
@@ -127,16 +328,16 @@ class AuditLogger:
         severity: Optional[str],
     ) -> None:
         self._append(
-            {
-                "record_type": "RULE_MATCH",
-                "logged_at": self._now_utc_iso(),
-                "event_id": event_id,
-                "event_type": event_type,
-                "rule_id": rule_id,
-                "rule_version": rule_version,
-                "risk_code": risk_code,
-                "severity": severity,
-            }
+            _RULE_MATCH_LINE
+            % (
+                _dumps(self._now_utc_iso()),
+                _dumps(event_id),
+                _dumps(event_type),
+                _dumps(rule_id),
+                _dumps(rule_version),
+                _dumps(risk_code),
+                _dumps(severity),
+            )
         )
 
     def log_rule_no_match(
@@ -147,16 +348,54 @@ class AuditLogger:
         ruleset_version: str,
     ) -> None:
         self._append(
-            {
-                "record_type": "RULE_NO_MATCH",
-                "logged_at": self._now_utc_iso(),
-                "event_id": event_id,
-                "event_type": event_type,
-                "ruleset_name": ruleset_name,
-                "ruleset_version": ruleset_version,
-            }
+            _RULE_NO_MATCH_LINE
+            % (
+                _dumps(self._now_utc_iso()),
+                _dumps(event_id),
+                _dumps(event_type),
+                _dumps(ruleset_name),
+                _dumps(ruleset_version),
+            )
         )
 
+    def log_rule_evaluations(
+        self,
+        ruleset_name: str,
+        ruleset_version: str,
+        outcomes: List[Tuple[Optional[str], Optional[str], Any]],
+    ) -> None:
+        """
+        Batch form of log_rule_evaluation_start + log_rule_match / log_rule_no_match:
+        the same records, in the same per-event order, queued as a single write
+        (RulesEngine.evaluate uses it with one outcome: one queue put per event, not two).
+        Each outcome is (event_id, event_type, match); match must expose .matched,
+        .rule_id, .rule_version, .risk_code and .severity.
+        """
+        if not outcomes:
+            return
+        logged_at = _dumps(self._now_utc_iso())
+        name = _dumps(ruleset_name)
+        version = _dumps(ruleset_version)
+
+        buf = bytearray()
+        for event_id, event_type, match in outcomes:
+            eid = _dumps(event_id)
+            et = _dumps(event_type)
+            buf += _RULE_EVAL_START_LINE % (logged_at, eid, et, name, version)
+            if match.matched:
+                buf += _RULE_MATCH_LINE % (
+                    logged_at,
+                    eid,
+                    et,
+                    _dumps(match.rule_id),
+                    _dumps(match.rule_version),
+                    _dumps(match.risk_code),
+                    _dumps(match.severity),
+                )
+            else:
+                buf += _RULE_NO_MATCH_LINE % (logged_at, eid, et, name, version)
+        self._append(bytes(buf))
+
     def log_alert_built(
         self,
         event_id: Optional[str],
@@ -195,6 +434,29 @@ class AuditLogger:
             }
         )
 
+    def log_alerts_persisted(
+        self,
+        count: int,
+        alert_ids: List[str],
+        persisted_at: str,
+        store_type: str,
+        store_path: str,
+    ) -> None:
+        """
+        Single record for a batch of alerts written through one store handle (sweep mode).
+        """
+        self._append(
+            {
+                "record_type": "ALERTS_PERSISTED",
+                "logged_at": self._now_utc_iso(),
+                "count": count,
+                "alert_ids": alert_ids,
+                "persisted_at": persisted_at,
+                "store_type": store_type,
+                "store_path": store_path,
+            }
+        )
+
     # -----------------------------
     # Phase 3.3: Suppression
     # -----------------------------
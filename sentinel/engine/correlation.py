@@ -1,11 +1,16 @@
 from __future__ import annotations
 
-import json
+import atexit
 import os
+import time
 from dataclasses import dataclass
 from datetime import datetime, timezone, timedelta
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
+
+import orjson
+
+from sentinel.engine.delta_log import DeltaLog
 
 
 @dataclass(frozen=True)
@@ -25,7 +30,8 @@ class CorrelationStore:
           "event_id": str,
           "event_type": str,
           "event_timestamp": str (UTC ISO),
-          "batch_token": Optional[str]
+          "batch_token": Optional[str],
+          "_epoch": float (POSIX seconds of event_timestamp; only for tz-aware timestamps)
         }
       ]
 
@@ -35,23 +41,84 @@ class CorrelationStore:
       - batch_token is treated as a non-sensitive surrogate/opaque token
       - Atomic writes (temp + fsync + replace) to prevent corrupted JSON on crash/interrupt
       - Safe read: auto-recovers if file is empty/corrupt
+
+    PERSISTENCE (log-structured):
+      - state_path holds a snapshot; <state>.log holds one JSONL delta per mutation
+        ({"op": "add", ...} / {"op": "prune", ...}), each tagged with a sequence number.
+      - The document is loaded lazily on first use (snapshot + log replay) and kept in memory;
+        constructing a store touches no files.
+      - Group commit: every checkpoint_every mutations the pending deltas are written to
+        the log, but fsynced at most once per SYNC_INTERVAL_SECONDS. checkpoint() is the
+        durable point (write + fsync); callers invoke it before emitting anything that
+        depends on the state, and it also runs at interpreter exit. This state is derived
+        (rebuildable from the audit trail), so a lost unsynced tail is acceptable.
+      - When the log outgrows COMPACT_RATIO x the snapshot, compact() folds it into a new
+        snapshot.
+      - The snapshot records the last folded sequence number (log_seq), so a crash
+        between snapshot replace and log truncation never replays a delta twice.
+      - Sequence numbering, replay and log truncation are DeltaLog's (delta_log.py).
+      - Several processes may share the state (an ingest during a sweep). Deltas are numbered
+        and written, and compaction runs, under DeltaLog's <state>.lock after folding in
+        other processes' deltas, so none is lost or truncated away. The in-memory document
+        picks up other processes' deltas at those points (and on load), not on every read.
     """
 
     VERSION = "0.1"
+    COMPACT_RATIO = 4
+    SYNC_INTERVAL_SECONDS = 1.0
 
-    def __init__(self, state_path: Path):
+    def __init__(self, state_path: Path, checkpoint_every: int = 100):
         self.path = state_path
+        self.log_path = self.path.with_suffix(".log")
+        self._loaded = False
+        self._doc: Dict[str, Any] = {}
+
+        self._delta_log = DeltaLog(self.log_path, self.path)
+        # Deltas applied in memory but not yet logged; numbered when written, under the lock
+        self._pending: List[Dict[str, Any]] = []
+        self._unsynced = False
+        self._last_sync = time.monotonic()
+        self._mutations = 0
+        self._checkpoint_every = max(1, int(checkpoint_every))
+        atexit.register(self.checkpoint)
+
+    def _ensure_loaded(self) -> None:
+        if self._loaded:
+            return
         self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._delta_log.locked():
+            self._load()
+        self._loaded = True
+
+    def _load(self) -> None:
+        # Under the state lock: snapshot + log replay
         if not self.path.exists():
             self._write_atomic(self._empty_doc())
+            self._doc = self._empty_doc()
+        else:
+            # If it exists but is corrupt/empty, recover on this first read
+            self._doc = self._read_safe(recover=True)
+        self._delta_log.replay(int(self._doc.get("log_seq") or 0), self._apply_delta)
 
-        # If it exists but is corrupt/empty, recover immediately
-        _ = self._read_safe(recover=True)
+    def _refresh(self) -> None:
+        """
+        Under the state lock: apply deltas other processes logged since our last read, or
+        reload if one of them compacted (our pending deltas are then applied again).
+        """
+        if not self._delta_log.refresh(self._apply_delta):
+            self._load()
+            for delta in self._pending:
+                self._apply_delta(delta)
 
     @staticmethod
     def _empty_doc() -> Dict[str, Any]:
         return {"version": CorrelationStore.VERSION, "groups": {}}
 
+    @staticmethod
+    def _join_key(key: Union[str, Tuple[str, ...]]) -> str:
+        # Persisted groups are keyed by the "|"-joined form
+        return "|".join(key) if isinstance(key, tuple) else str(key or "")
+
     @staticmethod
     def _parse_iso(ts: str) -> datetime:
         # Accept "Z" suffix
@@ -60,6 +127,16 @@ class CorrelationStore:
             s = s[:-1] + "+00:00"
         return datetime.fromisoformat(s)
 
+    @staticmethod
+    def _epoch_of(ts: str) -> Optional[float]:
+        # Parsed once at add time so prune compares floats. Naive or unparseable
+        # timestamps get no _epoch and keep prune's original parse/compare/drop behavior.
+        try:
+            dt = CorrelationStore._parse_iso(ts)
+        except ValueError:
+            return None
+        return dt.timestamp() if dt.tzinfo is not None else None
+
     @staticmethod
     def _now_utc() -> datetime:
         return datetime.now(timezone.utc)
@@ -69,10 +146,10 @@ class CorrelationStore:
         Read JSON state. If unreadable and recover=True, rewrite a clean doc.
         """
         try:
-            raw = self.path.read_text(encoding="utf-8")
+            raw = self.path.read_bytes()
             if not raw.strip():
                 raise ValueError("state file empty")
-            doc = json.loads(raw)
+            doc = orjson.loads(raw)
             if not isinstance(doc, dict):
                 raise ValueError("state root is not an object")
             if "groups" not in doc or not isinstance(doc.get("groups"), dict):
@@ -95,9 +172,9 @@ class CorrelationStore:
           - replace target
         """
         tmp_path = self.path.with_suffix(self.path.suffix + ".tmp")
-        data = json.dumps(obj, sort_keys=True, indent=2)
+        data = orjson.dumps(obj)  # compact: the snapshot is for machine recovery only
 
-        with tmp_path.open("w", encoding="utf-8", newline="\n") as f:
+        with tmp_path.open("wb") as f:
             f.write(data)
             f.flush()
             os.fsync(f.fileno())
@@ -105,60 +182,105 @@ class CorrelationStore:
         # Atomic replace on same filesystem
         os.replace(tmp_path, self.path)
 
-    def add_event(
-        self,
-        group_key: str,
-        event_id: str,
-        event_type: str,
-        event_timestamp: str,
-        batch_token: Optional[str] = None,
-    ) -> None:
-        doc = self._read_safe(recover=True)
-        groups: Dict[str, List[Dict[str, Any]]] = doc.get("groups", {}) or {}
+    def _apply_delta(self, delta: Dict[str, Any]) -> None:
+        if delta.get("op") == "add":
+            self._apply_add(str(delta["gk"]), dict(delta["rec"]))
+        elif delta.get("op") == "prune":
+            self._apply_prune(self._parse_iso(str(delta["cutoff"])))
+        else:
+            raise ValueError(f"unknown delta op: {delta.get('op')!r}")
 
-        gk = str(group_key or "").strip()
-        if not gk:
-            # If group key is empty, do nothing (keeps state sane)
+    def _log(self, delta: Dict[str, Any]) -> None:
+        self._pending.append(delta)
+        self._mutations += 1
+        if self._mutations >= self._checkpoint_every:
+            if time.monotonic() - self._last_sync >= self.SYNC_INTERVAL_SECONDS:
+                self.checkpoint()
+            else:
+                self._write_pending()
+
+    def _write_pending(self) -> None:
+        # Hand pending deltas to the OS (no fsync)
+        if not self._pending:
             return
+        with self._delta_log.locked():
+            self._refresh()
+            buf = bytearray()
+            for delta in self._pending:
+                buf += self._delta_log.encode(delta)
+            self._delta_log.write(buf)
+        self._pending.clear()
+        self._mutations = 0
+        self._unsynced = True
+
+    def checkpoint(self) -> None:
+        """
+        Durably append pending deltas to the log; compact if the log outgrew the snapshot.
+        """
+        with self._delta_log.locked():
+            self._write_pending()
+            if not self._unsynced:
+                return
+            self._delta_log.sync()
+            self._unsynced = False
+            self._last_sync = time.monotonic()
+
+            if self._delta_log.outgrew(self.COMPACT_RATIO):
+                self.compact()
+
+    def compact(self) -> None:
+        """
+        Write the in-memory document as a new snapshot and truncate the log, under the
+        state lock and after folding in other processes' deltas.
+        Pending (unlogged) deltas are already part of the document, so they are folded too.
+        """
+        self._ensure_loaded()
+        with self._delta_log.locked():
+            self._refresh()
+            self._doc["log_seq"] = self._delta_log.seq
+            self._write_atomic(self._doc)
+            self._pending.clear()
+            self._mutations = 0
+            self._unsynced = False
+            self._delta_log.truncate()
+
+    def _apply_add(self, gk: str, record: Dict[str, Any]) -> None:
+        groups: Dict[str, List[Dict[str, Any]]] = self._doc.get("groups", {}) or {}
 
         lst = groups.get(gk, [])
         if not isinstance(lst, list):
             lst = []
 
-        # Normalize timestamp (keep ISO string)
-        ts = str(event_timestamp or "").strip()
-        if not ts:
-            ts = self._now_utc().isoformat()
-
-        record = {
-            "event_id": str(event_id),
-            "event_type": str(event_type),
-            "event_timestamp": ts,
-            "batch_token": str(batch_token) if batch_token else None,
-        }
-
         lst.append(record)
         groups[gk] = lst
-        doc["groups"] = groups
-        doc["version"] = doc.get("version") or self.VERSION
-
-        self._write_atomic(doc)
-
-    def prune(self, max_age_minutes: int) -> None:
-        doc = self._read_safe(recover=True)
-        groups: Dict[str, List[Dict[str, Any]]] = doc.get("groups", {}) or {}
+        self._doc["groups"] = groups
+        self._doc["version"] = self._doc.get("version") or self.VERSION
 
-        cutoff = self._now_utc() - timedelta(minutes=int(max_age_minutes))
+    def _apply_prune(self, cutoff: datetime) -> bool:
+        """
+        Drop records older than cutoff and remove empty groups; returns False (document
+        untouched) if there was nothing to drop.
+        """
+        groups: Dict[str, List[Dict[str, Any]]] = self._doc.get("groups", {}) or {}
         new_groups: Dict[str, List[Dict[str, Any]]] = {}
+        changed = False
+        cutoff_epoch = cutoff.timestamp()
 
         for gk, events in groups.items():
             if not isinstance(events, list):
+                changed = True
                 continue
 
             kept: List[Dict[str, Any]] = []
             for e in events:
                 if not isinstance(e, dict):
                     continue
+                epoch = e.get("_epoch")
+                if isinstance(epoch, float):
+                    if epoch >= cutoff_epoch:
+                        kept.append(e)
+                    continue
+                # Records without _epoch (older state): parse the timestamp
                 try:
                     ts_raw = str(e.get("event_timestamp") or "").strip()
                     ts = self._parse_iso(ts_raw)
@@ -168,14 +290,79 @@ class CorrelationStore:
                     # Drop corrupted records to keep state clean
                     continue
 
+            if len(kept) != len(events) or not kept:
+                changed = True  # records dropped, or an empty group to remove
             if kept:
                 new_groups[str(gk)] = kept
 
-        doc["groups"] = new_groups
-        doc["version"] = doc.get("version") or self.VERSION
-        self._write_atomic(doc)
+        if not changed:
+            return False
+        self._doc["groups"] = new_groups
+        self._doc["version"] = self._doc.get("version") or self.VERSION
+        return True
+
+    def add_event(
+        self,
+        group_key: Union[str, Tuple[str, ...]],
+        event_id: str,
+        event_type: str,
+        event_timestamp: str,
+        batch_token: Optional[str] = None,
+    ) -> None:
+        gk = self._join_key(group_key).strip()
+        if not gk:
+            # If group key is empty, do nothing (keeps state sane)
+            return
+        self._ensure_loaded()
+
+        # Normalize timestamp (keep ISO string)
+        ts = str(event_timestamp or "").strip()
+        if not ts:
+            ts = self._now_utc().isoformat()
+
+        record: Dict[str, Any] = {
+            "event_id": str(event_id),
+            "event_type": str(event_type),
+            "event_timestamp": ts,
+            "batch_token": str(batch_token) if batch_token else None,
+        }
+        epoch = self._epoch_of(ts)
+        if epoch is not None:
+            record["_epoch"] = epoch
+
+        self._apply_add(gk, record)
+        self._log({"op": "add", "gk": gk, "rec": record})
+
+    def prune(self, max_age_minutes: int) -> None:
+        self._ensure_loaded()
+        cutoff = self._now_utc() - timedelta(minutes=int(max_age_minutes))
+        # An idle prune (nothing expired) leaves no delta to write or fsync
+        if self._apply_prune(cutoff):
+            self._log({"op": "prune", "cutoff": cutoff.isoformat()})
+
+    def groups(self) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Shallow copy of the current group_key -> events mapping (the event lists are shared).
+        """
+        self._ensure_loaded()
+        return dict(self._doc.get("groups", {}) or {})
+
+    def release_groups(self) -> Iterator[Tuple[str, List[Dict[str, Any]]]]:
+        """
+        Yield (group_key, events) for a read-only pass over every group, removing each group
+        from the in-memory document as it is handed out, so processed records become
+        collectable while later groups run. Durable state is untouched: pending deltas are
+        checkpointed first, and the next use of the store reloads it from disk.
+        """
+        self._ensure_loaded()
+        self.checkpoint()
+        groups: Dict[str, List[Dict[str, Any]]] = self._doc.get("groups", {}) or {}
+        self._doc = {}
+        self._loaded = False
+        for gk in list(groups):
+            yield gk, groups.pop(gk)
 
-    def get_group_events(self, group_key: str) -> List[Dict[str, Any]]:
-        doc = self._read_safe(recover=True)
-        groups: Dict[str, List[Dict[str, Any]]] = doc.get("groups", {}) or {}
-        return groups.get(str(group_key), [])
+    def get_group_events(self, group_key: Union[str, Tuple[str, ...]]) -> List[Dict[str, Any]]:
+        self._ensure_loaded()
+        groups: Dict[str, List[Dict[str, Any]]] = self._doc.get("groups", {}) or {}
+        return groups.get(self._join_key(group_key), [])
@@ -0,0 +1,196 @@
+from __future__ import annotations
+
+import os
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, BinaryIO, Callable, Dict, Iterator, Optional, Tuple, Union
+
+import orjson
+
+try:
+    import fcntl
+except ImportError:  # Windows: no flock; lock one byte of the lock file with msvcrt instead
+    fcntl = None
+    import msvcrt
+
+ApplyDelta = Callable[[Dict[str, Any]], None]
+
+
+def write_all(fh: BinaryIO, buf: Union[bytes, bytearray]) -> None:
+    """
+    Write buf in full to an unbuffered handle (raw writes may be short).
+    """
+    written = fh.write(buf)
+    while written < len(buf):
+        written += fh.write(buf[written:])
+
+
+def _lock(fh: BinaryIO) -> None:
+    if fcntl is not None:
+        fcntl.flock(fh.fileno(), fcntl.LOCK_EX)
+    else:
+        fh.seek(0)
+        msvcrt.locking(fh.fileno(), msvcrt.LK_LOCK, 1)  # retries ~10s, then OSError
+
+
+def _unlock(fh: BinaryIO) -> None:
+    if fcntl is not None:
+        fcntl.flock(fh.fileno(), fcntl.LOCK_UN)
+    else:
+        fh.seek(0)
+        msvcrt.locking(fh.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+class DeltaLog:
+    """
+    Append-only JSONL delta log kept next to a state snapshot (<state>.log).
+
+    Shared by the log-structured state stores: the store owns its in-memory document and
+    snapshot format; this class owns the sequence numbers, the log file and crash recovery.
+
+    RECOVERY:
+      - Every delta carries a sequence number ("seq"). The snapshot records the last
+        folded number (log_seq) and replay() skips deltas at or below it, so a crash
+        between snapshot replace and log truncation never applies a delta twice.
+      - A torn final line (crash mid-append) is truncated away before new deltas are
+        appended. Other unparseable lines and deltas the store cannot apply are skipped;
+        seq only advances past applied deltas.
+
+    CONCURRENCY (several processes on one state, e.g. an ingest run during a sweep):
+      - Loading, appending and compacting happen under locked(), an exclusive lock on
+        <state>.lock (flock; an msvcrt byte lock on Windows).
+      - Under the lock, a store calls refresh() before encoding: deltas other processes
+        appended since this process last read the log are applied first, so seq numbers
+        stay unique. If another process compacted meanwhile, refresh() returns False and
+        the store reloads snapshot + log.
+      - A store compacts only a refreshed document, under the same lock, so truncate()
+        never erases deltas that are not in the new snapshot.
+    """
+
+    def __init__(self, log_path: Path, snapshot_path: Path):
+        self.path = log_path
+        self.snapshot_path = snapshot_path
+        self.lock_path = log_path.with_suffix(".lock")
+        self.seq = 0
+        self._offset = 0  # bytes of the log already read by this process
+        self._snapshot_id: Optional[Tuple[int, int, int, int]] = None
+        self._fh: Optional[BinaryIO] = None  # opened on first write
+        self._lock_fh: Optional[BinaryIO] = None
+        self._lock_depth = 0
+
+    @contextmanager
+    def locked(self) -> Iterator[None]:
+        """
+        Hold the state's exclusive inter-process lock (re-entrant within this object).
+        """
+        if self._lock_depth == 0:
+            if self._lock_fh is None:
+                self._lock_fh = self.lock_path.open("ab")
+            _lock(self._lock_fh)
+        self._lock_depth += 1
+        try:
+            yield
+        finally:
+            self._lock_depth -= 1
+            if self._lock_depth == 0:
+                _unlock(self._lock_fh)
+
+    def _snapshot_stat(self) -> Optional[Tuple[int, int, int, int]]:
+        # Changes whenever a snapshot is written (atomic replace = new file)
+        try:
+            st = self.snapshot_path.stat()
+        except FileNotFoundError:
+            return None
+        return (st.st_ino, st.st_mtime_ns, st.st_ctime_ns, st.st_size)
+
+    def replay(self, log_seq: int, apply: ApplyDelta) -> None:
+        """
+        Start numbering after log_seq and pass each newer logged delta to apply(), in order.
+        Call under locked(), right after reading the snapshot.
+        """
+        self.seq = log_seq
+        self._offset = 0
+        self._snapshot_id = self._snapshot_stat()
+        self._read_new(apply)
+
+    def refresh(self, apply: ApplyDelta) -> bool:
+        """
+        Under locked(): pass deltas appended by other processes since the last read to
+        apply(). Returns False (nothing applied) if the snapshot was replaced or the log
+        truncated meanwhile; the store must then reload snapshot + log.
+        """
+        if self._snapshot_stat() != self._snapshot_id:
+            return False
+        return self._read_new(apply)
+
+    def _read_new(self, apply: ApplyDelta) -> bool:
+        try:
+            with self.path.open("rb") as f:
+                size = f.seek(0, os.SEEK_END)
+                if size < self._offset:
+                    return False  # truncated by another process
+                f.seek(self._offset)
+                raw = f.read()
+        except FileNotFoundError:
+            return self._offset == 0
+
+        end = raw.rfind(b"\n") + 1
+        if end < len(raw):
+            # Torn final line (crash mid-append; live writers hold the lock): cut it off,
+            # or the next append would be glued onto it and lost with it on replay
+            with self.path.open("r+b") as f:
+                f.truncate(self._offset + end)
+            raw = raw[:end]
+        self._offset += end
+
+        for line in raw.splitlines():
+            try:
+                delta = orjson.loads(line)
+                seq = int(delta["seq"])
+                if seq <= self.seq:
+                    continue  # already folded into the snapshot
+                apply(delta)
+            except Exception:
+                continue
+            self.seq = seq
+        return True
+
+    def encode(self, delta: Dict[str, Any]) -> bytes:
+        """
+        Tag delta with the next sequence number and return it as one JSONL line.
+        Call under locked(), after refresh().
+        """
+        self.seq += 1
+        delta["seq"] = self.seq
+        return orjson.dumps(delta, option=orjson.OPT_APPEND_NEWLINE)
+
+    def write(self, buf: Union[bytes, bytearray]) -> None:
+        # Hand encoded deltas to the OS (no fsync); under locked(), so they land at the
+        # offset this process has read up to
+        if self._fh is None:
+            self._fh = self.path.open("ab", buffering=0)
+        write_all(self._fh, buf)
+        self._offset += len(buf)
+
+    def sync(self) -> None:
+        if self._fh is not None:
+            os.fsync(self._fh.fileno())
+
+    def outgrew(self, ratio: int) -> bool:
+        """
+        True once the log is more than ratio x the snapshot's size (time to compact).
+        """
+        return self.path.stat().st_size > ratio * self.snapshot_path.stat().st_size
+
+    def truncate(self) -> None:
+        """
+        Empty the log. Call under locked(), after the store wrote a snapshot of its
+        refreshed document with log_seq = seq.
+        """
+        if self._fh is not None:
+            self._fh.close()
+            self._fh = None
+        with self.path.open("wb"):
+            pass
+        self._offset = 0
+        self._snapshot_id = self._snapshot_stat()
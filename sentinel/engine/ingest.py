@@ -4,15 +4,25 @@ import re
 from dataclasses import dataclass
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Tuple, Union
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
 
-import json
+import fastjsonschema
+import orjson
 import yaml
-from jsonschema import Draft202012Validator
+from jsonschema import Draft202012Validator, ValidationError
 
 
 JSONType = Union[Dict[str, Any], List[Any], str, int, float, bool, None]
 
+_NO_KEY = object()
+
+
+class _Index(int):
+    """List position inside a tripwire scan path (distinguishes [i] from a dict key)."""
+
+
+_ANCHORED_HEAD = re.compile(r"\^(?:\(([a-z0-9_?|]+)\)|([a-z0-9_]+))")
+
 
 @dataclass(frozen=True)
 class Rejection:
@@ -52,6 +62,7 @@ class Ingestor:
     def __init__(self, event_schema_path: Path, tripwire_config_path: Path, audit_logger: Any):
         self._audit = audit_logger
         self._schema_validator = self._load_schema_validator(event_schema_path)
+        self._schema_check = self._compile_schema_check(self._schema_validator)
         self._tripwires = self._load_tripwires(tripwire_config_path)
 
     @staticmethod
@@ -62,20 +73,28 @@ class Ingestor:
     def _load_schema_validator(schema_path: Path) -> Draft202012Validator:
         if not schema_path.exists():
             raise FileNotFoundError(f"Event schema not found: {schema_path}")
-        schema = json.loads(schema_path.read_text(encoding="utf-8"))
+        schema = orjson.loads(schema_path.read_bytes())
         validator = Draft202012Validator(schema)
         return validator
 
+    @staticmethod
+    def _compile_schema_check(validator: Draft202012Validator) -> Callable[[Any], Any]:
+        # Accept path: code generated once for this schema. Formats are annotations only,
+        # as with jsonschema's default, so both validators accept the same events.
+        return fastjsonschema.compile(validator.schema, use_formats=False)
+
     @staticmethod
     def _load_tripwires(path: Path) -> Dict[str, Any]:
         if not path.exists():
             raise FileNotFoundError(f"Tripwire config not found: {path}")
-        cfg = json.loads(path.read_text(encoding="utf-8"))
+        cfg = orjson.loads(path.read_bytes())
 
         # Defensive parsing + compilation
         prohibited_exact = set(k.lower() for k in cfg.get("prohibited_keys_exact", []))
-        key_patterns = [re.compile(p, flags=re.IGNORECASE) for p in cfg.get("prohibited_key_patterns_regex_i", [])]
-        str_patterns = [re.compile(p, flags=re.IGNORECASE) for p in cfg.get("prohibited_string_patterns_regex_i", [])]
+        # Each pattern list is combined into one alternation: one regex pass per key/string
+        key_pattern = Ingestor._combine_patterns(cfg.get("prohibited_key_patterns_regex_i", []))
+        str_pattern = Ingestor._combine_patterns(cfg.get("prohibited_string_patterns_regex_i", []))
+        key_prefixes = Ingestor._key_prefixes(cfg.get("prohibited_key_patterns_regex_i", []))
 
         logging_policy = cfg.get("logging_policy", {})
         log_payload_body_on_reject = bool(logging_policy.get("log_payload_body_on_reject", False))
@@ -83,11 +102,73 @@ class Ingestor:
         return {
             "version": cfg.get("version", "unknown"),
             "prohibited_exact": prohibited_exact,
-            "key_patterns": key_patterns,
-            "str_patterns": str_patterns,
+            "key_pattern": key_pattern,
+            "key_prefixes": key_prefixes,
+            "str_pattern": str_pattern,
             "log_payload_body_on_reject": log_payload_body_on_reject,  # should be False per policy
         }
 
+    @staticmethod
+    def _combine_patterns(patterns: List[str]) -> re.Pattern:
+        if not patterns:
+            return re.compile(r"(?!)")  # matches nothing
+        return re.compile("|".join(f"(?:{p})" for p in patterns), flags=re.IGNORECASE)
+
+    @staticmethod
+    def _key_prefixes(patterns: List[str]) -> Optional[Tuple[str, ...]]:
+        """
+        Literal prefixes that any key-pattern match must start with (cheap prefilter).
+        Only understands "^literal..." / "^(lit|lit)..." alternatives; returns None
+        (no prefilter, always run the regex) if any alternative has another shape.
+        """
+        prefixes: List[str] = []
+        for pattern in patterns:
+            if "\\" in pattern or "[" in pattern:
+                return None
+            for alt in Ingestor._split_top_level(pattern.lower()):
+                m = _ANCHORED_HEAD.match(alt)
+                if m is None:
+                    return None
+                nxt = alt[m.end():m.end() + 1]
+                if m.group(1) is not None:
+                    if nxt and nxt in "?*+{":
+                        return None  # optional group: no required literal
+                    pieces = m.group(1).split("|")
+                else:
+                    pieces = [m.group(2) + nxt]  # keep the next char so a trailing quantifier is seen
+                for piece in pieces:
+                    lit = Ingestor._required_head(piece)
+                    if not lit:
+                        return None
+                    prefixes.append(lit)
+        return tuple(sorted(set(prefixes)))
+
+    @staticmethod
+    def _required_head(piece: str) -> str:
+        # Leading literal run, stopping before the first quantified or non-literal character
+        end = 0
+        while end < len(piece) and piece[end].isascii() and (piece[end].isalnum() or piece[end] == "_"):
+            if end + 1 < len(piece) and piece[end + 1] in "?*+{":
+                break
+            end += 1
+        return piece[:end]
+
+    @staticmethod
+    def _split_top_level(pattern: str) -> List[str]:
+        parts: List[str] = []
+        depth = 0
+        start = 0
+        for i, ch in enumerate(pattern):
+            if ch == "(":
+                depth += 1
+            elif ch == ")":
+                depth -= 1
+            elif ch == "|" and depth == 0:
+                parts.append(pattern[start:i])
+                start = i + 1
+        parts.append(pattern[start:])
+        return parts
+
     def process_event(self, event: Dict[str, Any]) -> IngestResult:
         received_at = self._now_utc_iso()
 
@@ -97,9 +178,9 @@ class Ingestor:
         event_timestamp = self._safe_str(event.get("event_timestamp"))
 
         # 1) Schema validation (strict allow-list)
-        schema_errors = sorted(self._schema_validator.iter_errors(event), key=lambda e: e.path)
-        if schema_errors:
-            msg = self._format_schema_error(schema_errors[0])
+        schema_error = self._first_schema_error(event)
+        if schema_error is not None:
+            msg = self._format_schema_error(schema_error)
             rej = Rejection(
                 rejection_reason_code="SCHEMA_INVALID",
                 rejection_reason_text=msg,
@@ -138,6 +219,24 @@ class Ingestor:
         )
         return IngestResult(accepted=True, accepted_event=accepted_event)
 
+    def _first_schema_error(self, event: Dict[str, Any]) -> Optional[Exception]:
+        try:
+            self._schema_check(event)
+            return None
+        except fastjsonschema.JsonSchemaException as e:
+            fast_error = e
+        # Reject path only: the first error in path order (what sorting used to pick),
+        # found in one pass without sorting. Rejection texts are unchanged.
+        err = min(self._schema_validator.iter_errors(event), key=lambda e: e.path, default=None)
+        if err is not None:
+            return err
+        # The two validators disagree in corner cases (e.g. fastjsonschema's "$" does not
+        # match before a trailing newline). Fail closed: reject on the compiled check's error.
+        return ValidationError(
+            getattr(fast_error, "message", str(fast_error)),
+            path=list(getattr(fast_error, "path", None) or [])[1:],  # drop the leading "data"
+        )
+
     @staticmethod
     def _safe_str(val: Any) -> Optional[str]:
         if val is None:
@@ -155,11 +254,16 @@ class Ingestor:
     def _normalize_minimal(self, event: Dict[str, Any]) -> Dict[str, Any]:
         # Minimal normalization only: trim whitespace in known string fields if present.
         # No field additions; no GMP data.
-        out: Dict[str, Any] = dict(event)
-        for k, v in list(out.items()):
+        # Well-formed events need no trimming: return them as-is (callers do not mutate).
+        out: Optional[Dict[str, Any]] = None
+        for k, v in event.items():
             if isinstance(v, str):
-                out[k] = v.strip()
-        return out
+                stripped = v.strip()
+                if stripped != v:
+                    if out is None:
+                        out = dict(event)
+                    out[k] = stripped
+        return event if out is None else out
 
     def _scan_tripwires(self, obj: JSONType) -> Optional[Tuple[str, str]]:
         """
@@ -169,45 +273,53 @@ class Ingestor:
           - String values: regex patterns (units/spec/narrative indicators)
         """
         prohibited_exact = self._tripwires["prohibited_exact"]
-        key_patterns: List[re.Pattern] = self._tripwires["key_patterns"]
-        str_patterns: List[re.Pattern] = self._tripwires["str_patterns"]
+        key_pattern: re.Pattern = self._tripwires["key_pattern"]
+        key_prefixes: Optional[Tuple[str, ...]] = self._tripwires["key_prefixes"]
+        str_pattern: re.Pattern = self._tripwires["str_pattern"]
+
+        # Iterative depth-first walk in the same order as a recursive one. A path is a
+        # linked (parent, component) pair and is only formatted when something is reported.
+        stack: List[Tuple[JSONType, Any, Any]] = [(obj, None, _NO_KEY)]
+        while stack:
+            node, path, key = stack.pop()
+            if key is not _NO_KEY:
+                key_l = str(key).lower()
+
+                # Key exact match
+                if key_l in prohibited_exact:
+                    return ("PROHIBITED_DATA_DETECTED", f"Prohibited key detected at {self._format_path((path, key))}")
+
+                # Key regex patterns (prefix prefilter only for ASCII keys: IGNORECASE
+                # also folds a few non-ASCII letters onto ASCII ones)
+                if (
+                    key_prefixes is None
+                    or not key_l.isascii()
+                    or key_l.startswith(key_prefixes)
+                ) and key_pattern.search(key_l):
+                    return ("PROHIBITED_DATA_DETECTED", f"Prohibited key pattern detected at {self._format_path((path, key))}")
+
+                path = (path, key)
 
-        def scan(node: JSONType, path: str) -> Optional[Tuple[str, str]]:
             if isinstance(node, dict):
-                for key, val in node.items():
-                    key_l = str(key).lower()
-
-                    # Key exact match
-                    if key_l in prohibited_exact:
-                        return ("PROHIBITED_DATA_DETECTED", f"Prohibited key detected at {path}.{key}")
-
-                    # Key regex patterns
-                    for pat in key_patterns:
-                        if pat.search(key_l):
-                            return ("PROHIBITED_DATA_DETECTED", f"Prohibited key pattern detected at {path}.{key}")
-
-                    # Recurse into value
-                    hit = scan(val, f"{path}.{key}")
-                    if hit:
-                        return hit
-                return None
-
-            if isinstance(node, list):
-                for i, item in enumerate(node):
-                    hit = scan(item, f"{path}[{i}]")
-                    if hit:
-                        return hit
-                return None
-
-            if isinstance(node, str):
+                for k, val in reversed(node.items()):
+                    stack.append((val, path, k))
+            elif isinstance(node, list):
+                for idx in range(len(node) - 1, -1, -1):
+                    stack.append((node[idx], (path, _Index(idx)), _NO_KEY))
+            elif isinstance(node, str):
                 # String content tripwires
-                for pat in str_patterns:
-                    if pat.search(node):
-                        # Do NOT echo the string content back (avoid capturing GMP text)
-                        return ("PROHIBITED_DATA_DETECTED", f"Prohibited content pattern detected at {path}")
-                return None
-
+                if str_pattern.search(node):
+                    # Do NOT echo the string content back (avoid capturing GMP text)
+                    return ("PROHIBITED_DATA_DETECTED", f"Prohibited content pattern detected at {self._format_path(path)}")
             # primitives (int/float/bool/None) are allowed by schema; no action here
-            return None
 
-        return scan(obj, path="(root)")
+        return None
+
+    @staticmethod
+    def _format_path(path: Any) -> str:
+        parts: List[str] = []
+        while path is not None:
+            path, comp = path
+            parts.append(f"[{comp}]" if isinstance(comp, _Index) else f".{comp}")
+        parts.append("(root)")
+        return "".join(reversed(parts))
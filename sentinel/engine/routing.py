@@ -1,9 +1,10 @@
 from __future__ import annotations
 
+import functools
 import json
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 
 @dataclass(frozen=True)
@@ -23,20 +24,31 @@ class RoutingPolicy:
         if not self.allowed:
             raise ValueError("Routing policy allowed_consumers is empty; refusing to run.")
 
+        # Rules route to the same few consumer lists over and over; cache per policy instance
+        self._normalize_cached = functools.lru_cache(maxsize=1024)(self._normalize_tuple)
+
     def normalize(self, consumers: Optional[List[str]]) -> RoutingDecision:
         if not consumers:
             return RoutingDecision(consumers=[])
 
-        normalized: List[str] = []
+        try:
+            normalized = self._normalize_cached(tuple(consumers))
+        except TypeError:
+            # Unhashable entries: normalize without the cache
+            normalized = self._normalize_tuple(tuple(consumers))
+
+        # Fresh list per decision so callers never share the cached tuple's contents
+        return RoutingDecision(consumers=list(normalized))
+
+    def _normalize_tuple(self, consumers: Tuple[Any, ...]) -> Tuple[str, ...]:
+        # Alias mapping and allow-list enforcement in one pass
+        normalized = set()
         for c in consumers:
             c = str(c).strip()
             c = self.aliases.get(c, c)
-            normalized.append(c)
-
-        # enforce allow-list
-        for c in normalized:
             if c not in self.allowed:
                 raise ValueError(f"Routing consumer '{c}' is not in allowed_consumers allow-list.")
+            normalized.add(c)
 
         # stable order (deterministic)
-        return RoutingDecision(consumers=sorted(set(normalized)))
+        return tuple(sorted(normalized))
@@ -1,21 +1,31 @@
 from __future__ import annotations
 
+import functools
+import sys
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Sequence, Tuple
 
 import yaml
 
+# libyaml-backed loader when PyYAML was built with it (same safe subset, C parser)
+_YAML_SAFE_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
 
-@dataclass
+
+@dataclass(frozen=True, slots=True)
 class RuleMatchResult:
+    """
+    Immutable: match results are built once per rule at load and shared across events.
+    Use dataclasses.replace() to derive a per-event variant (e.g. normalized routing).
+    """
+
     matched: bool
     rule_id: Optional[str] = None
     rule_version: Optional[str] = None
     risk_code: Optional[str] = None
     severity: Optional[str] = None
     recommended_action: Optional[str] = None
-    routing_consumers: Optional[List[str]] = None
+    routing_consumers: Optional[Sequence[str]] = None
     suppression_window_minutes: Optional[int] = None
 
     # NEW: pass-through configs for Phase 3.5
@@ -23,11 +33,34 @@ class RuleMatchResult:
     qa_escalation: Optional[Dict[str, Any]] = None
 
 
+@dataclass(frozen=True, slots=True)
+class _CompiledRule:
+    """
+    Load-time view of one enabled rule: the exact-match conditions (as parallel key and
+    value tuples, empty when unconditional) plus the prebuilt match result, so evaluate()
+    does no per-event rule parsing or allocation.
+    """
+
+    cond_keys: Tuple[Any, ...]
+    cond_values: Tuple[Any, ...]
+    result: RuleMatchResult
+
+
+# Shared result for events no rule matches (safe to share: RuleMatchResult is frozen);
+# every no-match path returns this object, so callers may test `res is _NO_MATCH`
+_NO_MATCH = RuleMatchResult(matched=False)
+
+_MISSING = object()  # event field absent (distinct from an explicit None)
+
+
 class RulesEngine:
     """
     Deterministic, metadata-only rules evaluation.
     - Single-event rules match on event_type (+ optional exact conditions).
     - Correlation & QA escalation configs are returned for app-layer evaluation.
+    - Rules are validated and compiled once at load (malformed rules refuse to load) and
+      indexed by trigger event_type (event_type_any_of expanded); file order is kept
+      within each event_type.
     """
 
     def __init__(self, rules_path: Path, audit_logger: Any):
@@ -40,6 +73,15 @@ class RulesEngine:
         self._ruleset_version = self._rules_doc.get("ruleset", {}).get("version", "unknown")
         self._defaults = self._rules_doc.get("defaults", {}) or {}
         self._rules = self._rules_doc.get("rules", []) or []
+        self._by_event_type = self._index_rules(self._rules)
+
+        # A match depends only on event_type and the condition-referenced fields, so
+        # results are memoized on those values (audit logging stays outside the cache).
+        # Rules are loaded once per engine; a reload would need _match_cached.cache_clear().
+        self._all_condition_keys: Tuple[Any, ...] = tuple(
+            dict.fromkeys(k for rules in self._by_event_type.values() for cr in rules for k in cr.cond_keys)
+        )
+        self._match_cached = functools.lru_cache(maxsize=4096)(self._match)
 
         self._audit.log_rules_loaded(
             ruleset_name=self._ruleset_name,
@@ -49,105 +91,185 @@ class RulesEngine:
 
     @staticmethod
     def _load_rules(path: Path) -> Dict[str, Any]:
-        doc = yaml.safe_load(path.read_text(encoding="utf-8"))
+        doc = yaml.load(path.read_bytes(), Loader=_YAML_SAFE_LOADER)
         if not isinstance(doc, dict):
             raise ValueError("Rules YAML must parse to a dict.")
         return doc
 
-    def defaults(self) -> Dict[str, Any]:
-        return self._defaults
+    @staticmethod
+    def _index_rules(rules: List[Any]) -> Dict[str, List[_CompiledRule]]:
+        """
+        Validate every rule once and return event_type -> enabled rules in file order.
+        A malformed rule raises ValueError at load (refusing to run) instead of being
+        skipped or failing later on the event path.
+        """
+        by_event_type: Dict[str, List[_CompiledRule]] = {}
+        for index, rule in enumerate(rules):
+            if not isinstance(rule, dict):
+                raise ValueError(f"Rule #{index} must be a mapping.")
+            label = f"Rule #{index} ({rule.get('rule_id')!r})"
 
-    def evaluate(self, event: Dict[str, Any]) -> RuleMatchResult:
-        event_id = str(event.get("event_id", "")) or None
-        event_type = str(event.get("event_type", "")) or None
+            enabled = rule.get("enabled", False)
+            if not isinstance(enabled, bool):
+                raise ValueError(f"{label}: 'enabled' must be true or false.")
+            if not enabled:
+                continue
 
-        self._audit.log_rule_evaluation_start(
-            event_id=event_id,
-            event_type=event_type,
-            ruleset_name=self._ruleset_name,
-            ruleset_version=self._ruleset_version,
-        )
+            compiled, event_types = RulesEngine._compile_rule(rule, label)
+            # event_type_any_of is expanded into one bucket per member, so membership is the
+            # dict lookup in _match; no per-rule list or set is consulted per event
+            for et in dict.fromkeys(map(sys.intern, event_types)):
+                by_event_type.setdefault(et, []).append(compiled)
+        return by_event_type
 
-        for rule in self._rules:
-            if not isinstance(rule, dict):
-                continue
-            if not bool(rule.get("enabled", False)):
-                continue
+    @staticmethod
+    def _interned(value: Any) -> Optional[str]:
+        # str(value) or None, interned: rule metadata is a small fixed vocabulary
+        text = str(value)
+        return sys.intern(text) if text else None
 
-            trigger = rule.get("trigger", {}) or {}
-            if not isinstance(trigger, dict):
-                continue
+    @staticmethod
+    def _mapping(rule: Dict[str, Any], key: str, label: str) -> Dict[str, Any]:
+        value = rule.get(key)
+        if value is None:
+            return {}
+        if not isinstance(value, dict):
+            raise ValueError(f"{label}: '{key}' must be a mapping.")
+        return value
 
-            if not self._trigger_matches(trigger, event):
-                continue
+    @staticmethod
+    def _compile_rule(rule: Dict[str, Any], label: str) -> Tuple[_CompiledRule, List[str]]:
+        rule_id = rule.get("rule_id")
+        if not isinstance(rule_id, str) or not rule_id:
+            raise ValueError(f"{label}: 'rule_id' must be a non-empty string.")
+
+        trigger = RulesEngine._mapping(rule, "trigger", label)
+        any_of = trigger.get("event_type_any_of")
+        single = trigger.get("event_type")
+        if any_of is not None:
+            if not isinstance(any_of, list) or not any_of or not all(isinstance(x, str) for x in any_of):
+                raise ValueError(f"{label}: trigger.event_type_any_of must be a non-empty list of strings.")
+            event_types = list(any_of)
+        elif isinstance(single, str):
+            event_types = [single]
+        else:
+            raise ValueError(f"{label}: trigger needs event_type (string) or event_type_any_of.")
 
-            output = rule.get("output", {}) or {}
-            routing = rule.get("routing", {}) or {}
-            suppression = rule.get("suppression", {}) or {}
+        conditions = trigger.get("conditions")
+        if conditions is None:
+            conditions = {}
+        elif not isinstance(conditions, dict):
+            raise ValueError(f"{label}: trigger.conditions must be a mapping.")
 
-            consumers = None
-            if isinstance(routing, dict) and isinstance(routing.get("consumers"), list):
-                consumers = [str(x) for x in routing["consumers"]]
+        output = RulesEngine._mapping(rule, "output", label)
+        routing = RulesEngine._mapping(rule, "routing", label)
+        suppression = RulesEngine._mapping(rule, "suppression", label)
+        for passthrough in ("correlation", "qa_escalation"):
+            RulesEngine._mapping(rule, passthrough, label)  # shape check only; passed through as-is
 
-            window_minutes = None
-            if isinstance(suppression, dict) and suppression.get("window_minutes") is not None:
+        consumers = None
+        if routing.get("consumers") is not None:
+            if not isinstance(routing["consumers"], list):
+                raise ValueError(f"{label}: routing.consumers must be a list.")
+            consumers = tuple(sys.intern(str(x)) for x in routing["consumers"])
+
+        window_minutes = None
+        if suppression.get("window_minutes") is not None:
+            try:
                 window_minutes = int(suppression["window_minutes"])
+            except (TypeError, ValueError):
+                raise ValueError(f"{label}: suppression.window_minutes must be an integer.") from None
+
+        result = RuleMatchResult(
+            matched=True,
+            rule_id=sys.intern(rule_id),
+            rule_version=RulesEngine._interned(rule.get("rule_version", "")),
+            risk_code=RulesEngine._interned(output.get("risk_code", "")),
+            severity=RulesEngine._interned(output.get("severity", "")),
+            recommended_action=RulesEngine._interned(output.get("recommended_action", "")),
+            routing_consumers=consumers,
+            suppression_window_minutes=window_minutes,
+            correlation=rule.get("correlation"),
+            qa_escalation=rule.get("qa_escalation"),
+        )
+        compiled = _CompiledRule(
+            cond_keys=tuple(conditions.keys()),
+            cond_values=tuple(conditions.values()),
+            result=result,
+        )
+        return compiled, event_types
+
+    def defaults(self) -> Dict[str, Any]:
+        return self._defaults
 
-            res = RuleMatchResult(
-                matched=True,
-                rule_id=str(rule.get("rule_id", "")) or None,
-                rule_version=str(rule.get("rule_version", "")) or None,
-                risk_code=str(output.get("risk_code", "")) or None,
-                severity=str(output.get("severity", "")) or None,
-                recommended_action=str(output.get("recommended_action", "")) or None,
-                routing_consumers=consumers,
-                suppression_window_minutes=window_minutes,
-                correlation=rule.get("correlation"),
-                qa_escalation=rule.get("qa_escalation"),
-            )
-
-            self._audit.log_rule_match(
-                event_id=event_id,
-                event_type=event_type,
-                rule_id=res.rule_id,
-                rule_version=res.rule_version,
-                risk_code=res.risk_code,
-                severity=res.severity,
-            )
-            return res
-
-        self._audit.log_rule_no_match(
-            event_id=event_id,
-            event_type=event_type,
+    def evaluate(self, event: Dict[str, Any]) -> RuleMatchResult:
+        # Each event field is read once; audit labels keep the str(... or "") or None form
+        event_id = str(event.get("event_id", "")) or None
+        raw_event_type = event.get("event_type", _MISSING)
+        event_type = None if raw_event_type is _MISSING else (str(raw_event_type) or None)
+
+        res = self._lookup(event, None if raw_event_type is _MISSING else raw_event_type)
+        # RULE_EVAL_START + RULE_MATCH / RULE_NO_MATCH go to the audit writer as one queued line pair
+        self._audit.log_rule_evaluations(
             ruleset_name=self._ruleset_name,
             ruleset_version=self._ruleset_version,
+            outcomes=[(event_id, event_type, res)],
         )
-        return RuleMatchResult(matched=False)
+        return res
 
-    @staticmethod
-    def _trigger_matches(trigger: Dict[str, Any], event: Dict[str, Any]) -> bool:
-        et = event.get("event_type")
+    def evaluate_many(self, events: List[Dict[str, Any]]) -> List[RuleMatchResult]:
+        """
+        Batch form of evaluate(): one result per event, in input order. The per-event audit
+        records are the same as evaluate() writes, queued to the audit log as one write.
+        Matching is memoized per (event_type, condition values), so a homogeneous batch
+        resolves each distinct event shape once; the rest are cache hits.
+        """
+        results: List[RuleMatchResult] = []
+        outcomes: List[Tuple[Optional[str], Optional[str], RuleMatchResult]] = []
+        lookup = self._lookup
+        add_result = results.append
+        add_outcome = outcomes.append
+        for event in events:
+            raw_event_type = event.get("event_type", _MISSING)
+            if raw_event_type is _MISSING:
+                res = lookup(event, None)
+                event_type = None
+            else:
+                res = lookup(event, raw_event_type)
+                event_type = str(raw_event_type) or None
+            add_result(res)
+            add_outcome((str(event.get("event_id", "")) or None, event_type, res))
 
-        any_of = trigger.get("event_type_any_of")
-        single = trigger.get("event_type")
+        self._audit.log_rule_evaluations(
+            ruleset_name=self._ruleset_name,
+            ruleset_version=self._ruleset_version,
+            outcomes=outcomes,
+        )
+        return results
 
-        if any_of is not None:
-            if not isinstance(any_of, list):
-                return False
-            if et not in any_of:
-                return False
-        elif single is not None:
-            if et != single:
-                return False
-        else:
-            return False
+    def _lookup(self, event: Dict[str, Any], raw_event_type: Any) -> RuleMatchResult:
+        cond_values = tuple(map(event.get, self._all_condition_keys))
+        try:
+            return self._match_cached(raw_event_type, cond_values)
+        except TypeError:
+            return self._match(raw_event_type, cond_values)  # unhashable field values: uncached
 
-        conditions = trigger.get("conditions")
-        if conditions is not None:
-            if not isinstance(conditions, dict):
-                return False
-            for k, v in conditions.items():
-                if event.get(k) != v:
-                    return False
-
-        return True
+    def _match(self, event_type: Any, cond_values: Tuple[Any, ...]) -> RuleMatchResult:
+        """
+        First rule (file order) whose trigger matches, given the event's event_type and its
+        values for _all_condition_keys (same order).
+        """
+        try:
+            candidates = self._by_event_type.get(event_type, ())
+        except TypeError:
+            return _NO_MATCH  # unhashable event_type matches no rule
+
+        # Cheap check first, and nothing else: candidates are already filtered by event_type,
+        # and output/routing/suppression were extracted at load. Keep any per-rule field
+        # extraction out of this loop -- it must never run for a rule whose trigger fails.
+        fields = dict(zip(self._all_condition_keys, cond_values))
+        for cr in candidates:
+            if cr.cond_keys and tuple(map(fields.get, cr.cond_keys)) != cr.cond_values:
+                continue
+            return cr.result
+        return _NO_MATCH
@@ -1,13 +1,19 @@
 from __future__ import annotations
 
-import json
+import atexit
+import os
+import time
 from dataclasses import dataclass
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Optional, Tuple, Union
 
+import orjson
 
-@dataclass(frozen=True)
+from sentinel.engine.delta_log import DeltaLog
+
+
+@dataclass(frozen=True, slots=True)
 class SuppressionDecision:
     suppressed: bool
     suppression_key: str
@@ -22,40 +28,166 @@ class SuppressionStore:
     Stores only:
       suppression_key -> last_emitted_at (UTC ISO)
     No payloads. No GMP.
+
+    PERSISTENCE (log-structured):
+      - state_path holds a snapshot; <state>.log holds one JSONL record per flushed key
+        ({"k": suppression_key, "t": last_emitted_at, "seq": n}); only a key's latest
+        value since the previous flush is written.
+      - The document is loaded once (snapshot + log replay) and kept in memory;
+        check_and_update works on that copy.
+      - flush() appends pending updates to the log and fsyncs, debounced to every
+        flush_every pending keys or flush_interval_seconds; flush(force=True) writes
+        immediately. Callers flush(force=True) at transaction boundaries (before an
+        alert that depends on the update is emitted); it also runs at interpreter exit.
+      - When the log outgrows COMPACT_RATIO x the snapshot, compact() rewrites the
+        snapshot atomically (temp + fsync + replace) and truncates the log. The snapshot
+        records the last folded sequence number (log_seq), so no update is replayed twice.
+        Sequence numbering, replay and log truncation are DeltaLog's (delta_log.py).
+      - Several processes may share the state (an ingest during a sweep). Updates are
+        numbered and written, and compaction runs, under DeltaLog's <state>.lock after
+        folding in other processes' updates, so none is lost or truncated away. The
+        in-memory copy picks those up at load and at each flush, not on every check.
+      - Flushes cost O(updates) bytes regardless of key count, and a full snapshot rewrite
+        only follows COMPACT_RATIO x snapshot-size bytes of log, so rewrites are amortized
+        O(1) per update. The snapshot is therefore kept as one file (no key sharding).
     """
 
-    def __init__(self, state_path: Path):
+    COMPACT_RATIO = 4
+
+    def __init__(self, state_path: Path, flush_every: int = 100, flush_interval_seconds: float = 1.0):
         self.path = state_path
+        self.log_path = self.path.with_suffix(".log")
         self.path.parent.mkdir(parents=True, exist_ok=True)
-        if not self.path.exists():
-            self._write({"version": "0.1", "state": {}})
+        self._delta_log = DeltaLog(self.log_path, self.path)
+        with self._delta_log.locked():
+            self._load()
+
+        # suppression_key -> (last_emitted_at, its POSIX seconds): parsed at most once per value
+        self._epochs: Dict[str, Tuple[str, float]] = {}
+
+        # suppression_key -> latest last_emitted_at not yet logged; repeated updates of a key
+        # between flushes coalesce into one log line
+        self._pending: Dict[str, str] = {}
+        self._flush_every = max(1, int(flush_every))
+        self._flush_interval = float(flush_interval_seconds)
+        self._last_flush_ts = time.monotonic()
+        atexit.register(self.flush, True)
 
     @staticmethod
-    def _now_utc() -> datetime:
-        return datetime.now(timezone.utc)
+    def _iso_of(ts: float) -> str:
+        # UTC ISO string (same form as datetime.now(timezone.utc).isoformat()); only
+        # needed at the persistence boundary, the window check works on epoch seconds
+        return datetime.fromtimestamp(ts, timezone.utc).isoformat()
+
+    @staticmethod
+    def _join_key(key: Union[str, Tuple[str, ...]]) -> str:
+        # Persisted state is keyed by the "|"-joined form
+        return "|".join(key) if isinstance(key, tuple) else key
 
     @staticmethod
     def _parse_iso(ts: str) -> datetime:
         # python 3.14 supports fromisoformat with timezone offsets
         return datetime.fromisoformat(ts)
 
+    @staticmethod
+    def _epoch_of(ts: str) -> float:
+        dt = SuppressionStore._parse_iso(ts)
+        if dt.tzinfo is None:
+            # Naive stamps never compared against aware "now" before either: fail open
+            raise ValueError("naive last_emitted_at")
+        return dt.timestamp()
+
     def _read(self) -> Dict[str, Any]:
-        return json.loads(self.path.read_text(encoding="utf-8"))
+        return orjson.loads(self.path.read_bytes())
 
     def _write(self, obj: Dict[str, Any]) -> None:
-        self.path.write_text(json.dumps(obj, sort_keys=True, indent=2), encoding="utf-8")
+        # Atomic: a crash mid-write never leaves a truncated state file behind
+        tmp_path = self.path.with_suffix(self.path.suffix + ".tmp")
+        with tmp_path.open("wb") as f:
+            f.write(orjson.dumps(obj, option=orjson.OPT_SORT_KEYS | orjson.OPT_INDENT_2))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+
+    def _load(self) -> None:
+        # Under the state lock: snapshot + log replay
+        if not self.path.exists():
+            self._write({"version": "0.1", "state": {}})
+        self._doc = self._read()
+        self._delta_log.replay(int(self._doc.get("log_seq") or 0), self._apply_delta)
+
+    def _refresh(self) -> None:
+        """
+        Under the state lock: apply updates other processes logged since our last read (or
+        reload if one of them compacted), then our pending updates, which are newer.
+        """
+        if not self._delta_log.refresh(self._apply_delta):
+            self._load()
+        self._doc.setdefault("state", {}).update(self._pending)
+
+    def _apply_delta(self, delta: Dict[str, Any]) -> None:
+        self._doc.setdefault("state", {})[str(delta["k"])] = str(delta["t"])
+
+    def flush(self, force: bool = False) -> None:
+        """
+        Durably append pending updates to the log; compact if the log outgrew the snapshot.
+        Without force, only once flush_every pending keys or flush_interval_seconds have passed.
+        """
+        if not self._pending:
+            return
+        if not force and (
+            len(self._pending) < self._flush_every
+            and time.monotonic() - self._last_flush_ts < self._flush_interval
+        ):
+            return
+
+        with self._delta_log.locked():
+            self._refresh()
+            buf = bytearray()
+            for key, ts in self._pending.items():
+                buf += self._delta_log.encode({"k": key, "t": ts})
+            self._delta_log.write(buf)
+            self._delta_log.sync()
+            self._pending.clear()
+            self._last_flush_ts = time.monotonic()
+
+            if self._delta_log.outgrew(self.COMPACT_RATIO):
+                self.compact()
+
+    def compact(self) -> None:
+        """
+        Write the in-memory document as a new snapshot and truncate the log, under the
+        state lock and after folding in other processes' updates.
+        Pending (unlogged) updates are already part of the document, so they are folded too.
+        """
+        with self._delta_log.locked():
+            self._refresh()
+            self._doc["log_seq"] = self._delta_log.seq
+            self._write(self._doc)
+            self._pending.clear()
+            self._delta_log.truncate()
 
-    def check_and_update(self, suppression_key: str, window_minutes: int) -> SuppressionDecision:
-        doc = self._read()
+    def check_and_update(
+        self,
+        suppression_key: Union[str, Tuple[str, ...]],
+        window_minutes: int,
+    ) -> SuppressionDecision:
+        suppression_key = self._join_key(suppression_key)
+        doc = self._doc
         state: Dict[str, str] = doc.get("state", {}) or {}
 
-        now = self._now_utc()
+        now_ts = time.time()
 
         last = state.get(suppression_key)
         if last:
             try:
-                last_dt = self._parse_iso(last)
-                delta_min = (now - last_dt).total_seconds() / 60.0
+                cached = self._epochs.get(suppression_key)
+                if cached is not None and cached[0] == last:
+                    last_ts = cached[1]
+                else:
+                    last_ts = self._epoch_of(last)
+                    self._epochs[suppression_key] = (last, last_ts)
+                delta_min = (now_ts - last_ts) / 60.0
                 if delta_min < float(window_minutes):
                     return SuppressionDecision(
                         suppressed=True,
@@ -69,9 +201,11 @@ class SuppressionStore:
                 pass
 
         # Not suppressed -> update last emitted
-        state[suppression_key] = now.isoformat()
+        state[suppression_key] = self._iso_of(now_ts)
+        self._epochs[suppression_key] = (state[suppression_key], now_ts)
         doc["state"] = state
-        self._write(doc)
+        self._pending[suppression_key] = state[suppression_key]
+        self.flush()
 
         return SuppressionDecision(
             suppressed=False,
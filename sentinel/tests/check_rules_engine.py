@@ -0,0 +1,136 @@
+"""
+Evaluation-path check for RulesEngine.
+
+Exercises the compiled rule index:
+  - candidate filtering reads only event_type and trigger conditions; output, routing
+    and suppression fields are never consulted per event (a failing candidate's result
+    is never touched)
+  - every no-match path, single and batch, cached and uncached, returns the shared
+    _NO_MATCH object, so callers may test `res is _NO_MATCH`
+
+Run from the repository root:
+  python -m sentinel.tests.check_rules_engine
+"""
+from __future__ import annotations
+
+import tempfile
+from pathlib import Path
+from typing import Any, Dict
+
+import yaml
+
+from sentinel.engine.audit import AuditLogger
+from sentinel.engine.rules_engine import _NO_MATCH, RulesEngine, _CompiledRule
+
+RULES = {
+    "ruleset": {"name": "check", "version": "0"},
+    "rules": [
+        {
+            "rule_id": "R-FAIL",
+            "enabled": True,
+            "trigger": {"event_type": "CALC_STATUS_CHANGED", "conditions": {"calc_status": "FAIL"}},
+            "output": {"risk_code": "DR-F", "severity": "CRITICAL", "recommended_action": "Review."},
+            "routing": {"consumers": ["QA"]},
+            "suppression": {"window_minutes": 30},
+        },
+        {
+            "rule_id": "R-WARN",
+            "enabled": True,
+            "trigger": {"event_type": "CALC_STATUS_CHANGED", "conditions": {"calc_status": "WARN"}},
+            "output": {"risk_code": "DR-W", "severity": "HIGH", "recommended_action": "Review."},
+            "routing": {"consumers": ["DOC"]},
+        },
+        {
+            "rule_id": "R-ANY",
+            "enabled": True,
+            "trigger": {"event_type_any_of": ["CALC_STATUS_CHANGED", "STEP_OPENED"]},
+            "output": {"risk_code": "DR-A", "severity": "LOW", "recommended_action": "Note."},
+            "routing": {"consumers": ["AREA_MANAGEMENT"]},
+        },
+    ],
+}
+
+
+class _Tripwire:
+    """Stands in for rule data that evaluation must not read: any attribute access raises."""
+
+    def __init__(self, what: str):
+        object.__setattr__(self, "_what", what)
+
+    def __getattribute__(self, name: str):
+        raise AssertionError(f"evaluation read {object.__getattribute__(self, '_what')}.{name}")
+
+
+def _engine(tmp: Path, audit: AuditLogger, rules: Dict[str, Any] = RULES) -> RulesEngine:
+    rules_path = tmp / "rules.yaml"
+    rules_path.write_text(yaml.safe_dump(rules), encoding="utf-8")
+    return RulesEngine(rules_path=rules_path, audit_logger=audit)
+
+
+def check_candidate_filtering(tmp: Path, audit: AuditLogger) -> None:
+    engine = _engine(tmp, audit)
+
+    # Raw rule fields are compiled at load; trip any per-event read of them
+    for rule in engine._rules:
+        for field in ("output", "routing", "suppression"):
+            rule[field] = _Tripwire(f"{rule['rule_id']}.{field}")
+
+    # Candidates whose conditions fail keep a result that must never be touched
+    for et, rules in engine._by_event_type.items():
+        engine._by_event_type[et] = [
+            cr if cr.result.rule_id == "R-ANY"
+            else _CompiledRule(cr.cond_keys, cr.cond_values, _Tripwire(f"{cr.result.rule_id}.result"))
+            for cr in rules
+        ]
+    engine._match_cached.cache_clear()
+
+    res = engine.evaluate({"event_id": "EVT-1", "event_type": "CALC_STATUS_CHANGED", "calc_status": "PASS"})
+    assert res.matched and res.rule_id == "R-ANY", res
+    assert res.routing_consumers == ("AREA_MANAGEMENT",), res.routing_consumers
+
+    many = engine.evaluate_many(
+        [
+            {"event_id": "EVT-2", "event_type": "STEP_OPENED"},
+            {"event_id": "EVT-3", "event_type": "CALC_STATUS_CHANGED", "calc_status": "OK"},
+        ]
+    )
+    assert [r.rule_id for r in many] == ["R-ANY", "R-ANY"], many
+
+
+def check_no_match_identity(tmp: Path, audit: AuditLogger) -> None:
+    # Conditional rules only, so a CALC event whose status matches none falls through
+    conditional = {**RULES, "rules": [r for r in RULES["rules"] if r["rule_id"] != "R-ANY"]}
+    engine = _engine(tmp, audit, conditional)
+
+    misses = [
+        {"event_id": "EVT-1", "event_type": "UNKNOWN_EVENT"},
+        {"event_id": "EVT-2"},  # no event_type
+        {"event_id": "EVT-3", "event_type": "CALC_STATUS_CHANGED", "calc_status": "PASS"},
+        {"event_id": "EVT-4", "event_type": "CALC_STATUS_CHANGED", "calc_status": "PASS"},  # cache hit
+        {"event_id": "EVT-5", "event_type": ["CALC_STATUS_CHANGED"]},  # unhashable event_type
+        {"event_id": "EVT-6", "event_type": "CALC_STATUS_CHANGED", "calc_status": ["FAIL"]},  # uncached
+    ]
+    for event in misses:
+        res = engine.evaluate(event)
+        assert res is _NO_MATCH, (event["event_id"], res)
+
+    hit = {"event_id": "EVT-7", "event_type": "CALC_STATUS_CHANGED", "calc_status": "FAIL"}
+    many = engine.evaluate_many(misses + [hit])
+    assert all(r is _NO_MATCH for r in many[:-1]), many
+    assert many[-1] is not _NO_MATCH and many[-1].rule_id == "R-FAIL", many[-1]
+
+
+def main() -> int:
+    with tempfile.TemporaryDirectory() as tmp:
+        audit = AuditLogger(Path(tmp) / "audit_log.jsonl")
+        try:
+            check_candidate_filtering(Path(tmp), audit)
+            check_no_match_identity(Path(tmp), audit)
+        finally:
+            audit.close()
+    print("RULES ENGINE OK ✅")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
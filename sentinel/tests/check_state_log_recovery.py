@@ -0,0 +1,183 @@
+"""
+Crash-recovery check for the log-structured state stores (snapshot + <state>.log).
+
+Exercises DeltaLog replay through CorrelationStore and SuppressionStore:
+  - state survives a reload (snapshot + log replay)
+  - a torn final log line is skipped and numbering continues after it
+  - a crash between snapshot replace and log truncation never replays a delta twice
+  - compaction folds the log into the snapshot and truncates it
+  - two writers on one state (e.g. an ingest during a sweep) never lose each other's deltas
+
+Run from the repository root:
+  python -m sentinel.tests.check_state_log_recovery
+"""
+from __future__ import annotations
+
+import tempfile
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+from sentinel.engine.correlation import CorrelationStore
+from sentinel.engine.suppression import SuppressionStore
+
+
+def _ts(minutes_ago: int) -> str:
+    return (datetime.now(timezone.utc) - timedelta(minutes=minutes_ago)).isoformat()
+
+
+def _no_auto_compact(store):
+    # Tiny test snapshots would otherwise be compacted on every sync, leaving nothing to replay
+    store.COMPACT_RATIO = 10**9
+    return store
+
+
+def check_correlation(tmp: Path) -> None:
+    path = tmp / "correlation_state.json"
+
+    store = _no_auto_compact(CorrelationStore(path))
+    store.add_event(("SITE", "AREA"), "EVT-1", "STEP_OPENED", _ts(10), "BT-1")
+    store.add_event(("SITE", "AREA"), "EVT-2", "STEP_COMPLETED", _ts(5), "BT-1")
+    store.checkpoint()
+    assert path.with_suffix(".log").stat().st_size > 0, "deltas were not logged"
+
+    # Reload: snapshot + replayed log
+    ids = [e["event_id"] for e in CorrelationStore(path).get_group_events(("SITE", "AREA"))]
+    assert ids == ["EVT-1", "EVT-2"], ids
+
+    # Torn final line: skipped, and the next delta is still numbered after the last good one
+    with path.with_suffix(".log").open("ab") as f:
+        f.write(b'{"op":"add","gk":"SITE|AREA","rec":{"event_id":"EVT-TORN"')
+    store = _no_auto_compact(CorrelationStore(path))
+    store.add_event(("SITE", "AREA"), "EVT-3", "STEP_OPENED", _ts(1), "BT-2")
+    store.checkpoint()
+    ids = [e["event_id"] for e in CorrelationStore(path).get_group_events(("SITE", "AREA"))]
+    assert ids == ["EVT-1", "EVT-2", "EVT-3"], ids
+
+    # Crash after the compacted snapshot was written but before the log was truncated
+    log_before = path.with_suffix(".log").read_bytes()
+    store = CorrelationStore(path)
+    store.compact()
+    assert path.with_suffix(".log").stat().st_size == 0, "compaction left the log in place"
+    path.with_suffix(".log").write_bytes(log_before)
+    ids = [e["event_id"] for e in CorrelationStore(path).get_group_events(("SITE", "AREA"))]
+    assert ids == ["EVT-1", "EVT-2", "EVT-3"], f"deltas replayed twice: {ids}"
+
+    # Compaction triggered by log growth
+    store = CorrelationStore(path, checkpoint_every=1)
+    for i in range(200):
+        store.add_event(("SITE", f"AREA-{i % 7}"), f"EVT-G-{i}", "STEP_OPENED", _ts(1), None)
+    store.checkpoint()
+    assert path.with_suffix(".log").stat().st_size <= CorrelationStore.COMPACT_RATIO * path.stat().st_size
+    groups = CorrelationStore(path).groups()
+    assert sum(len(v) for v in groups.values()) == 203, len(groups)
+
+
+def check_correlation_two_writers(tmp: Path) -> None:
+    path = tmp / "correlation_two_writers.json"
+
+    # Both load the same (empty) state, then append interleaved: every delta needs its own seq
+    a = _no_auto_compact(CorrelationStore(path))
+    b = _no_auto_compact(CorrelationStore(path))
+    a.get_group_events("G")
+    b.get_group_events("G")
+    a.add_event("G", "EVT-A1", "STEP_OPENED", _ts(3), "BT-A")
+    a.checkpoint()
+    b.add_event("G", "EVT-B1", "STEP_OPENED", _ts(2), "BT-B")
+    b.checkpoint()
+    a.add_event("G", "EVT-A2", "STEP_COMPLETED", _ts(1), "BT-A")
+    a.checkpoint()
+    ids = sorted(e["event_id"] for e in CorrelationStore(path).get_group_events("G"))
+    assert ids == ["EVT-A1", "EVT-A2", "EVT-B1"], f"a writer's delta was lost: {ids}"
+
+    # One writer compacts while the other has logged deltas the compactor never read
+    b.add_event("G", "EVT-B2", "STEP_OPENED", _ts(1), "BT-B")
+    b.checkpoint()
+    a.compact()
+    b.add_event("G", "EVT-B3", "STEP_OPENED", _ts(1), "BT-B")  # b must notice the new snapshot
+    b.checkpoint()
+    ids = sorted(e["event_id"] for e in CorrelationStore(path).get_group_events("G"))
+    assert ids == ["EVT-A1", "EVT-A2", "EVT-B1", "EVT-B2", "EVT-B3"], f"compaction lost deltas: {ids}"
+    ids = sorted(e["event_id"] for e in b.get_group_events("G"))
+    assert ids == ["EVT-A1", "EVT-A2", "EVT-B1", "EVT-B2", "EVT-B3"], f"writer view diverged: {ids}"
+
+
+def check_suppression(tmp: Path) -> None:
+    path = tmp / "suppression_state.json"
+
+    store = _no_auto_compact(SuppressionStore(path))
+    first = store.check_and_update(("R-1", "SITE", "BT-1"), window_minutes=60)
+    assert not first.suppressed
+    store.flush(force=True)
+    assert path.with_suffix(".log").stat().st_size > 0, "updates were not logged"
+
+    # Reload: the update came back from the log
+    again = SuppressionStore(path).check_and_update(("R-1", "SITE", "BT-1"), window_minutes=60)
+    assert again.suppressed and again.last_emitted_at == first.last_emitted_at, again
+
+    # Torn final line: skipped
+    with path.with_suffix(".log").open("ab") as f:
+        f.write(b'{"k":"R-2|SITE|BT-2","t":')
+    store = _no_auto_compact(SuppressionStore(path))
+    assert not store.check_and_update(("R-2", "SITE", "BT-2"), window_minutes=60).suppressed
+    store.flush(force=True)
+    assert SuppressionStore(path).check_and_update(("R-2", "SITE", "BT-2"), window_minutes=60).suppressed
+
+    # Crash between snapshot replace and log truncation; a later update must still win
+    log_before = path.with_suffix(".log").read_bytes()
+    store = SuppressionStore(path)
+    store.compact()
+    path.with_suffix(".log").write_bytes(log_before)
+    store = _no_auto_compact(SuppressionStore(path))
+    store._doc["state"]["R-1|SITE|BT-1"] = "2000-01-01T00:00:00+00:00"  # expired entry
+    assert not store.check_and_update(("R-1", "SITE", "BT-1"), window_minutes=60).suppressed
+    store.flush(force=True)
+    reloaded = SuppressionStore(path)
+    assert not reloaded._doc["state"]["R-1|SITE|BT-1"].startswith("2000"), "stale delta replayed over newer one"
+
+    # Compaction triggered by log growth
+    store = SuppressionStore(path, flush_every=1)
+    for i in range(200):
+        store.check_and_update(("R-3", "SITE", f"BT-{i}"), window_minutes=60)
+    store.flush(force=True)
+    assert path.with_suffix(".log").stat().st_size <= SuppressionStore.COMPACT_RATIO * path.stat().st_size
+    assert len(SuppressionStore(path)._doc["state"]) == 202
+
+
+def check_suppression_two_writers(tmp: Path) -> None:
+    path = tmp / "suppression_two_writers.json"
+
+    # Both load the same state; a lost update here would mean a duplicate alert later
+    a = _no_auto_compact(SuppressionStore(path))
+    b = _no_auto_compact(SuppressionStore(path))
+    assert not a.check_and_update(("R-1", "SITE", "BT-A"), window_minutes=60).suppressed
+    a.flush(force=True)
+    assert not b.check_and_update(("R-1", "SITE", "BT-B"), window_minutes=60).suppressed
+    b.flush(force=True)
+    reloaded = SuppressionStore(path)
+    for bt in ("BT-A", "BT-B"):
+        assert reloaded.check_and_update(("R-1", "SITE", bt), window_minutes=60).suppressed, f"{bt} update lost"
+
+    # One writer compacts while the other has logged updates the compactor never read
+    assert not b.check_and_update(("R-1", "SITE", "BT-C"), window_minutes=60).suppressed
+    b.flush(force=True)
+    a.compact()
+    assert not b.check_and_update(("R-1", "SITE", "BT-D"), window_minutes=60).suppressed
+    b.flush(force=True)
+    reloaded = SuppressionStore(path)
+    for bt in ("BT-A", "BT-B", "BT-C", "BT-D"):
+        assert reloaded.check_and_update(("R-1", "SITE", bt), window_minutes=60).suppressed, f"{bt} update lost"
+    assert a.check_and_update(("R-1", "SITE", "BT-B"), window_minutes=60).suppressed, "writer view diverged"
+
+
+def main() -> int:
+    with tempfile.TemporaryDirectory() as tmp:
+        check_correlation(Path(tmp))
+        check_correlation_two_writers(Path(tmp))
+        check_suppression(Path(tmp))
+        check_suppression_two_writers(Path(tmp))
+    print("STATE LOG RECOVERY OK ✅")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())